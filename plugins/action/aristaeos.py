@@ -11,18 +11,21 @@ Email                   : juztas (at) gmail.com
 Date                    : 2023/11/06
 """
 import copy
+import os
 # Copyright: Contributors to the Ansible project
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 import sys
 
 from ansible import constants as C
 from ansible.module_utils._text import to_text
-from ansible.module_utils.connection import Connection
+from ansible.module_utils.connection import Connection, ConnectionError
 from ansible.utils.display import Display
 from ansible_collections.ansible.netcommon.plugins.action.network import \
     ActionModule as ActionNetworkModule
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import \
     load_provider
+from ansible_collections.sense.aristaeos.plugins.module_utils.connpool import \
+    ConnectionPool
 from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import \
     aristaeos_provider_spec
 from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import \
@@ -35,12 +38,47 @@ display = Display()
 class ActionModule(ActionNetworkModule):
     """Ansible Action Module"""
 
+    def getPool(self, task_vars):
+        """Get warm connection pool (None if disabled with aristaeos_pool: false)"""
+        if not task_vars.get("aristaeos_pool", True):
+            return None
+        registry = task_vars.get(
+            "aristaeos_pool_registry",
+            os.path.join(os.path.expanduser(C.PERSISTENT_CONTROL_PATH_DIR), "aristaeos_pool.json"),
+        )
+        # Persistent connection process exits after PERSISTENT_CONNECT_TIMEOUT of idle time
+        idleTimeout = min(
+            int(task_vars.get("aristaeos_pool_idle_timeout", C.PERSISTENT_CONNECT_TIMEOUT)),
+            C.PERSISTENT_CONNECT_TIMEOUT,
+        )
+        return ConnectionPool(
+            registry,
+            maxPerHost=int(task_vars.get("aristaeos_pool_max_per_host", 2)),
+            idleTimeout=idleTimeout,
+        )
+
+    @staticmethod
+    def closeEvicted(entries):
+        """Close connections evicted from pool (pool never evicts busy entries)"""
+        for entry in entries:
+            if not os.path.exists(entry["socket"]):
+                continue
+            try:
+                Connection(entry["socket"]).close()
+            except ConnectionError as ex:
+                display.vvvv(f"unable to close evicted connection {entry['socket']}: {ex}")
+
     def run(self, tmp=None, task_vars=None):
         """aristaEOS Ansible Run"""
 
         self._config_module = self._task.action.split(".")[-1] == "aristaeos_config"
         sockPath = None
+        atExec = False
         persConn = self._play_context.connection.split(".")[-1]
+        pool = self.getPool(task_vars)
+        poolKey = None
+        poolAuth = None
+        held = None
 
         if persConn == "network_cli":
             provider = self._task.args.get("provider", {})
@@ -49,51 +87,105 @@ class ActionModule(ActionNetworkModule):
                     "provider is unnecessary when using network_cli and will be ignored"
                 )
                 del self._task.args["provider"]
+            poolKey = (
+                self._play_context.remote_addr,
+                int(self._play_context.port or 22),
+                self._play_context.remote_user,
+            )
+            poolAuth = [self._play_context.password, self._play_context.become, self._play_context.become_pass]
+            if pool:
+                entry = pool.acquire(*poolKey, auth=poolAuth)
+                held = entry["socket"] if entry else None
+                atExec = bool(entry and entry["socket"] == self._connection.socket_path and entry["atExec"])
         elif self._play_context.connection == "local":
             provider = load_provider(aristaeos_provider_spec, self._task.args)
-            plc = copy.deepcopy(self._play_context)
-            plc.connection = "network_cli"
-            plc.network_os = "sense.aristaeos.aristaeos"
-            plc.remote_addr = provider["host"] or self._play_context.remote_addr
-            plc.port = int(provider["port"] or self._play_context.port or 22)
-            plc.remote_user = provider["username"] or self._play_context.connection_user
-            plc.password = provider["password"] or self._play_context.password
-            plc.private_key_file = (
-                provider["ssh_keyfile"] or self._play_context.private_key_file
+            poolKey = (
+                provider["host"] or self._play_context.remote_addr,
+                int(provider["port"] or self._play_context.port or 22),
+                provider["username"] or self._play_context.connection_user,
             )
-            command_timeout = int(provider["timeout"] or C.PERSISTENT_COMMAND_TIMEOUT)
-            plc.become = provider["authorize"] or False
-            if plc.become:
-                plc.become_method = "enable"
-            plc.become_pass = provider["auth_pass"]
-
-            display.vvv("using connection plugin %s" % plc.connection, plc.remote_addr)
-            connection = self._shared_loader_obj.connection_loader.get(
-                "persistent", plc, sys.stdin
-            )
-            connection.set_options(
-                direct={"persistent_command_timeout": command_timeout}
-            )
-
-            sockPath = connection.run()
-            display.vvvv("socket_path: %s" % sockPath, plc.remote_addr)
-            if not sockPath:
-                return {
-                    "failed": True,
-                    "msg": "unable to open shell. Please see: https://docs.ansible.com/ansible/network_debug_troubleshooting.html#unable-to-open-shell",
-                }
+            poolAuth = [
+                provider["password"] or self._play_context.password,
+                provider["authorize"] or False,
+                provider["auth_pass"],
+            ]
+            entry = pool.acquire(*poolKey, auth=poolAuth) if pool else None
+            if entry:
+                display.vvvv("reusing pooled socket_path: %s" % entry["socket"], poolKey[0])
+                sockPath = held = entry["socket"]
+                atExec = entry["atExec"]
+            else:
+                sockPath = self.startConnection(provider)
+                if not sockPath:
+                    return {
+                        "failed": True,
+                        "msg": "unable to open shell. Please see: https://docs.ansible.com/ansible/network_debug_troubleshooting.html#unable-to-open-shell",
+                    }
 
             task_vars["ansible_socket"] = sockPath
 
         if not sockPath:
             sockPath = self._connection.socket_path
 
-        conn = Connection(sockPath)
-        out = conn.get_prompt()
-        while to_text(out, errors="surrogate_then_replace").strip().endswith(")#"):
-            display.vvvv("wrong context, send exit...", self._play_context.remote_addr)
-            conn.send_command("exit")
-            out = conn.get_prompt()
+        scheduler = self._task.args.get("scheduler")
+        if isinstance(scheduler, dict) and not scheduler.get("device"):
+            # Scheduler state is keyed by device address, so it is shared by all
+            # forks and playbook runs against the same device
+            scheduler["device"] = (poolKey[0] if poolKey else None) or task_vars.get("inventory_hostname")
+        largeFacts = self._task.args.get("large_facts")
+        if isinstance(largeFacts, dict) and not largeFacts.get("host"):
+            # Large fact files of hosts sharing one path are named by inventory host
+            largeFacts["host"] = task_vars.get("inventory_hostname")
+        if self._task.args.get("dest") and not self._task.args.get("dest_host"):
+            # Command output files of hosts sharing one dest are named by inventory host
+            self._task.args["dest_host"] = task_vars.get("inventory_hostname")
 
-        result = super(ActionModule, self).run(task_vars=task_vars)
+        result = {"failed": True}
+        try:
+            if not atExec:
+                conn = Connection(sockPath)
+                out = conn.get_prompt()
+                while to_text(out, errors="surrogate_then_replace").strip().endswith(")#"):
+                    display.vvvv("wrong context, send exit...", self._play_context.remote_addr)
+                    conn.send_command("exit")
+                    out = conn.get_prompt()
+
+            result = super(ActionModule, self).run(task_vars=task_vars)
+        finally:
+            if pool and poolKey:
+                # Modules leave the session at exec prompt unless they failed.
+                # Release also clears busy mark of acquired (held) socket
+                self.closeEvicted(
+                    pool.release(*poolKey, sockPath, not result.get("failed"), auth=poolAuth, held=held)
+                )
         return result
+
+    def startConnection(self, provider):
+        """Start persistent connection for local connection mode and return socket path"""
+        plc = copy.deepcopy(self._play_context)
+        plc.connection = "network_cli"
+        plc.network_os = "sense.aristaeos.aristaeos"
+        plc.remote_addr = provider["host"] or self._play_context.remote_addr
+        plc.port = int(provider["port"] or self._play_context.port or 22)
+        plc.remote_user = provider["username"] or self._play_context.connection_user
+        plc.password = provider["password"] or self._play_context.password
+        plc.private_key_file = (
+            provider["ssh_keyfile"] or self._play_context.private_key_file
+        )
+        command_timeout = int(provider["timeout"] or C.PERSISTENT_COMMAND_TIMEOUT)
+        plc.become = provider["authorize"] or False
+        if plc.become:
+            plc.become_method = "enable"
+        plc.become_pass = provider["auth_pass"]
+
+        display.vvv("using connection plugin %s" % plc.connection, plc.remote_addr)
+        connection = self._shared_loader_obj.connection_loader.get(
+            "persistent", plc, sys.stdin
+        )
+        connection.set_options(
+            direct={"persistent_command_timeout": command_timeout}
+        )
+
+        sockPath = connection.run()
+        display.vvvv("socket_path: %s" % sockPath, plc.remote_addr)
+        return sockPath
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Action module for staged config rollout to many Arista EOS devices
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/02
+
+Runs once on the controller and pushes config to all hosts concurrently in
+waves (canary first), verifying each wave and halting or rolling back on failure:
+  - sense.aristaeos.aristaeos_rollout:
+      hosts: "{{ groups['leafs'] }}"
+      lines: ["interface Ethernet1/1", "description sense"]
+      waves: [1, "10%", "50%", "100%"]
+    run_once: true
+    delegate_to: localhost
+"""
+from ansible.utils.display import Display
+from ansible_collections.sense.aristaeos.plugins.action.aristaeos import \
+    ActionModule as ActionAristaModule
+from ansible_collections.sense.aristaeos.plugins.module_utils.rollout import (
+    Rollout, rollout_spec)
+from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import \
+    classwrapper
+
+display = Display()
+
+
+@classwrapper
+class ActionModule(ActionAristaModule):
+    """Ansible Action Module for staged rollout"""
+
+    def getProvider(self, host, hostvars):
+        """Get connection provider of inventory host"""
+        hvars = hostvars[host]
+        return {
+            "host": hvars.get("ansible_host", host),
+            "port": hvars.get("ansible_port"),
+            "username": hvars.get("ansible_user"),
+            "password": hvars.get("ansible_password"),
+            "ssh_keyfile": hvars.get("ansible_ssh_private_key_file"),
+            "authorize": hvars.get("ansible_become", False),
+            "auth_pass": hvars.get("ansible_become_password"),
+            "timeout": hvars.get("ansible_command_timeout"),
+        }
+
+    def run(self, tmp=None, task_vars=None):
+        """Run rollout"""
+        validation, params = self.validate_argument_spec(
+            argument_spec=rollout_spec,
+            mutually_exclusive=[("lines", "host_lines")],
+            required_one_of=[("lines", "host_lines")],
+        )
+        del validation
+        hostvars = task_vars["hostvars"]
+        unknown = [host for host in params["hosts"] if host not in hostvars]
+        if unknown:
+            return {"failed": True, "msg": f"hosts not in inventory: {', '.join(unknown)}"}
+
+        def connect(host):
+            sockPath = self.startConnection(self.getProvider(host, hostvars))
+            if not sockPath:
+                raise ConnectionError(f"{host}: unable to open shell")
+            display.vvvv(f"rollout socket_path: {sockPath}", host)
+            return sockPath
+
+        result = Rollout(params, connect).run()
+        result["changed"] = any(
+            dev["status"] in ["applied", "verified", "rolled_back"] for dev in result["devices"].values()
+        )
+        if result["failed"]:
+            result["msg"] = "Rollout halted" if result["halted"] else "Rollout finished with failures"
+        return result
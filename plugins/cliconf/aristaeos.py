@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Cliconf plugin for Arista EOS
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/07
+
+Keeps running config (text and parsed tree) in the persistent connection
+process, so successive tasks on the same device reuse one fetch and one parse.
+Cache is invalidated by edit_config, invalidate_config (called by module_utils
+load_config), config_cache_ttl and optional config_cache_probe command.
+Cache is off by default (ttl 0), so config changed out-of-band is never served
+stale unless user opts in. EOS has no cheap config change counter, so probe is
+a user supplied command (e.g. 'show logging last 1 hours | include SYS-5-CONFIG')
+whose output change means config changed. Without probe, changes made outside
+of this connection are seen only after ttl expires.
+"""
+DOCUMENTATION = """
+author: Justas Balcas
+name: aristaeos
+short_description: Cliconf plugin for Arista EOS with running config cache
+description:
+- Running config cache shared by all tasks using the same persistent connection.
+options:
+  config_cache_ttl:
+    type: int
+    default: 0
+    description:
+    - Seconds cached running config is valid. 0 (default) disables cache.
+    - Without config_cache_probe, config changed outside of this connection is
+      served stale (and modules diff against it) until ttl expires.
+    env:
+    - name: ANSIBLE_ARISTAEOS_CONFIG_CACHE_TTL
+    vars:
+    - name: ansible_aristaeos_config_cache_ttl
+  config_cache_probe:
+    type: str
+    description:
+    - Command whose output changes when config changes. Run before serving cached config.
+    env:
+    - name: ANSIBLE_ARISTAEOS_CONFIG_CACHE_PROBE
+    vars:
+    - name: ansible_aristaeos_config_cache_probe
+  config_commands:
+    type: list
+    elements: str
+    default: []
+    description:
+    - Commands which are changing config (used by network_cli to invalidate its response cache).
+    vars:
+    - name: ansible_aristaeos_config_commands
+"""
+import hashlib
+import json
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils._text import to_bytes, to_text
+from ansible_collections.ansible.netcommon.plugins.plugin_utils.cliconf_base import \
+    CliconfBase
+from ansible_collections.sense.aristaeos.plugins.module_utils.configtree import \
+    ConfigTree
+
+
+class Cliconf(CliconfBase):
+    """Arista EOS cliconf"""
+
+    __rpc__ = CliconfBase.__rpc__ + ["get_config_section", "invalidate_config", "get_config_cache_stats"]
+
+    def __init__(self, *args, **kwargs):
+        super(Cliconf, self).__init__(*args, **kwargs)
+        self._device_info = {}
+        self._configs = {}
+        self._cacheStats = {"hits": 0, "misses": 0, "parses": 0, "invalidations": 0}
+
+    def getOption(self, name, default=None):
+        """Get plugin option, default if options are not loaded"""
+        try:
+            value = self.get_option(name)
+        except (KeyError, AttributeError):
+            return default
+        return default if value is None else value
+
+    def runProbe(self):
+        """Get digest of config change probe output (None if probe is not set)"""
+        probe = self.getOption("config_cache_probe")
+        if not probe:
+            return None
+        return hashlib.sha256(to_bytes(self.send_command(probe), errors="surrogate_or_strict")).hexdigest()
+
+    def getEntry(self, flags):
+        """Get cached config entry of flags, fetch it if missing or invalid"""
+        key = " ".join(flags or [])
+        ttl = int(self.getOption("config_cache_ttl", 0))
+        entry = self._configs.get(key)
+        probe = self.runProbe() if ttl > 0 else None
+        if entry and time.time() - entry["fetched"] < ttl and probe == entry["probe"]:
+            self._cacheStats["hits"] += 1
+            return entry
+        self._cacheStats["misses"] += 1
+        text = to_text(
+            self.send_command(f"show running-config {key}".strip()), errors="surrogate_or_strict"
+        ).strip()
+        entry = {"text": text, "tree": None, "fetched": time.time(), "probe": probe}
+        if ttl > 0:
+            self._configs[key] = entry
+        return entry
+
+    def get_config(self, source="running", flags=None, format=None):
+        """Get (cached) running config text"""
+        if source != "running":
+            raise ValueError(f"fetching configuration from {source} is not supported")
+        return self.getEntry(flags)["text"]
+
+    def get_config_section(self, parents, flags=None):
+        """Get parents and children lines from (cached) parsed config tree"""
+        entry = self.getEntry(flags)
+        if entry["tree"] is None:
+            entry["tree"] = ConfigTree(entry["text"])
+            self._cacheStats["parses"] += 1
+        return entry["tree"].section(parents)
+
+    def invalidate_config(self):
+        """Drop cached config (after config change)"""
+        self._configs.clear()
+        self._cacheStats["invalidations"] += 1
+
+    def get_config_cache_stats(self):
+        """Get cache statistics"""
+        return dict(self._cacheStats, entries=len(self._configs))
+
+    def edit_config(self, candidate=None, commit=True, replace=None, comment=None):
+        """Apply candidate lines in configure terminal session"""
+        if replace or comment:
+            raise AnsibleConnectionFailure("replace and comment are not supported by aristaeos cliconf")
+        responses = []
+        try:
+            self.send_command("configure terminal")
+            for line in candidate or []:
+                if isinstance(line, dict):
+                    responses.append(self.send_command(**line))
+                elif line != "end":
+                    responses.append(self.send_command(line))
+        finally:
+            self.send_command("end")
+            self.invalidate_config()
+        return {"request": candidate, "response": responses}
+
+    def get(self, command=None, prompt=None, answer=None, sendonly=False, newline=True, check_all=False):
+        """Run command on device"""
+        if not command:
+            raise ValueError("must provide value of command to execute")
+        return self.send_command(
+            command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all
+        )
+
+    def get_device_info(self):
+        """Get device info"""
+        if not self._device_info:
+            self._device_info = {"network_os": "aristaeos"}
+            try:
+                data = json.loads(to_text(self.send_command("show version | json"), errors="surrogate_or_strict"))
+            except (ValueError, AnsibleConnectionFailure):
+                return self._device_info
+            self._device_info["network_os_version"] = data.get("version")
+            self._device_info["network_os_model"] = data.get("modelName")
+        return self._device_info
+
+    def get_device_operations(self):
+        """Get supported device operations"""
+        return {
+            "supports_diff_replace": False,
+            "supports_commit": False,
+            "supports_rollback": False,
+            "supports_defaults": False,
+            "supports_onbox_diff": False,
+            "supports_commit_comment": False,
+            "supports_multiline_delimiter": False,
+            "supports_diff_match": False,
+            "supports_diff_ignore_lines": False,
+            "supports_generate_diff": False,
+            "supports_replace": False,
+        }
+
+    def get_capabilities(self):
+        """Get capabilities"""
+        result = super(Cliconf, self).get_capabilities()
+        result["device_operations"] = self.get_device_operations()
+        return json.dumps(result)
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Filter plugins for VLAN and port allocation on Arista EOS
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/25
+
+Usage:
+  devices: map of device name to aristaeos_facts output (ansible_facts or hostvars)
+  "{{ devices | sense.aristaeos.free_vlans(['sw1:Ethernet1/1', 'sw2:Port-Channel501'], '3600-3700') }}"
+  "{{ devices | sense.aristaeos.spare_bandwidth(10000) }}"
+"""
+from collections import OrderedDict
+
+from ansible.errors import AnsibleFilterError
+from ansible_collections.sense.aristaeos.plugins.module_utils import \
+    vlanbitmap
+from ansible_collections.sense.aristaeos.plugins.module_utils.resindex import \
+    ResourceIndex
+
+# Indexes of recently used device maps, keyed by object id and size
+_INDEXES = OrderedDict()
+_MAX_INDEXES = 8
+
+
+def getIndex(devices):
+    """Get resource index of devices map, built once per map"""
+    key = (id(devices), len(devices))
+    if key in _INDEXES and _INDEXES[key][0] is devices:
+        _INDEXES.move_to_end(key)
+        return _INDEXES[key][1]
+    index = ResourceIndex(devices)
+    _INDEXES[key] = (devices, index)
+    while len(_INDEXES) > _MAX_INDEXES:
+        _INDEXES.popitem(last=False)
+    return index
+
+
+def parsePath(path):
+    """Parse path items 'device:port', [device, port] or {device: .., port: ..}"""
+    out = []
+    for item in path:
+        if isinstance(item, dict):
+            out.append((item["device"], item["port"]))
+        elif isinstance(item, str):
+            device, sep, port = item.partition(":")
+            if not sep:
+                raise AnsibleFilterError(f"path item {item} is not in device:port format")
+            out.append((device, port))
+        else:
+            out.append(tuple(item))
+    return out
+
+
+def free_vlans(devices, path, pool="1-4094", within_allowed=False, output="ranges"):
+    """VLANs unused on every port of path, as range string or list"""
+    index = getIndex(devices)
+    try:
+        free = index.freeVlans(parsePath(path), vlanbitmap.parseRanges(pool), within_allowed)
+    except KeyError as ex:
+        raise AnsibleFilterError(f"unknown device/port {ex}") from ex
+    if output == "list":
+        return vlanbitmap.toList(free)
+    return vlanbitmap.toRanges(free)
+
+
+def spare_bandwidth(devices, min_bandwidth=0, only=None, reserved=None, up_only=True):
+    """Ports with spare bandwidth (Mbps) of at least min_bandwidth"""
+    return getIndex(devices).spareBandwidth(min_bandwidth, only, reserved, up_only)
+
+
+def vlan_ranges(vlans):
+    """Convert list of VLAN ids to compact range string"""
+    return vlanbitmap.toRanges(vlanbitmap.fromList(vlans))
+
+
+class FilterModule:
+    """Arista EOS resource filters"""
+
+    def filters(self):
+        """Return filters"""
+        return {
+            "free_vlans": free_vlans,
+            "spare_bandwidth": spare_bandwidth,
+            "vlan_ranges": vlan_ranges,
+        }
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""EOS config checkpoints: save, restore in one device operation, retention.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/09
+"""
+import re
+import time
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import \
+    run_commands
+
+checkpoint_spec = {
+    "name": {"type": "str"},
+    "prefix": {"default": "sense-", "type": "str"},
+    "retention": {"default": 5, "type": "int"},
+}
+
+# `dir checkpoint:` file line: permissions, size, date and file name
+DIR_LINE_RE = re.compile(r"^\s*[-d][-rwx]+\s+\d+\s+.*\s(\S+)\s*$")
+NAME_RE = re.compile(r"^[\w.\-]+$")
+
+
+def getCheckpointName(prefix):
+    """Get new checkpoint name, names of one prefix sort chronologically"""
+    return f"{prefix}{time.strftime('%Y%m%d%H%M%S')}{int(time.time() * 1000) % 1000:03d}"
+
+
+def checkName(module, name):
+    """Fail if checkpoint name is not a plain file name"""
+    if not NAME_RE.match(name):
+        module.fail_json(msg=f"invalid checkpoint name {name}")
+    return name
+
+
+def listCheckpoints(module, prefix=""):
+    """List checkpoint names with prefix, oldest first"""
+    out = run_commands(module, ["dir checkpoint:"])[0]
+    names = []
+    for line in out.split("\n"):
+        match = DIR_LINE_RE.match(line)
+        if match and match.group(1).startswith(prefix):
+            names.append(match.group(1))
+    return sorted(names)
+
+
+def saveCheckpoint(module, name):
+    """Save running config to checkpoint"""
+    run_commands(module, [f"configure checkpoint save {checkName(module, name)}"])
+    return name
+
+
+def restoreCheckpoint(module, name):
+    """Replace running config with checkpoint (single device operation)"""
+    run_commands(module, [f"configure replace checkpoint:{checkName(module, name)}"])
+    return name
+
+
+def pruneCheckpoints(module, prefix, retention, keep=None):
+    """Delete oldest checkpoints with prefix, keeping retention newest (and keep)"""
+    names = [name for name in listCheckpoints(module, prefix) if name != keep]
+    limit = max(retention - (1 if keep else 0), 0)
+    deleted = names[: max(len(names) - limit, 0)]
+    if deleted:
+        run_commands(module, [f"delete checkpoint:{name}" for name in deleted])
+    return deleted
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Per command collection statistics (latency, size, parse time, retries).
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/18
+"""
+import os
+import tempfile
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import jsoncodec
+
+# Per command statistics of this module run
+COLLECTION_STATS = {}
+
+PROMETHEUS_METRICS = [
+    ("latency_seconds", "Time spent waiting for command output"),
+    ("bytes", "Size of command output"),
+    ("parse_seconds", "Time spent parsing command output"),
+    ("calls", "Number of times command was executed"),
+    ("retries", "Number of executions of command retried after a failed attempt"),
+    ("errors", "Number of failed executions of command"),
+]
+
+
+def record(command, seconds, nbytes, failed=False, retry=False):
+    """Record one execution of command. retry is set only by retry sites (command
+    executed again after a failed attempt); repeated calls of the same command,
+    e.g. by two fact subsets or wait_for polling, are counted only in calls"""
+    stats = COLLECTION_STATS.setdefault(
+        command, {"calls": 0, "retries": 0, "errors": 0, "latency_seconds": 0.0, "bytes": 0}
+    )
+    stats["calls"] += 1
+    if retry:
+        stats["retries"] += 1
+    stats["latency_seconds"] += seconds
+    stats["bytes"] += nbytes
+    if failed:
+        stats["errors"] += 1
+
+
+def getStats():
+    """Get per command statistics, including parse time from json decoder"""
+    out = {}
+    for command, stats in COLLECTION_STATS.items():
+        decode = jsoncodec.DECODE_STATS.get(command, {})
+        out[command] = dict(
+            stats,
+            latency_seconds=round(stats["latency_seconds"], 6),
+            parse_seconds=round(decode.get("decode_seconds", 0.0), 6),
+        )
+    return out
+
+
+def escapeLabel(value):
+    """Escape prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def toPrometheus(stats, device):
+    """Format statistics in prometheus text exposition format"""
+    lines = []
+    for key, helptext in PROMETHEUS_METRICS:
+        name = f"aristaeos_command_{key}"
+        lines.append(f"# HELP {name} {helptext}")
+        lines.append(f"# TYPE {name} gauge")
+        for command, vals in sorted(stats.items()):
+            labels = f'device="{escapeLabel(device)}",command="{escapeLabel(command)}"'
+            lines.append(f"{name}{{{labels}}} {vals.get(key, 0)}")
+    return "\n".join(lines) + "\n"
+
+
+def writePrometheus(fname, stats, device):
+    """Write statistics to prometheus node exporter textfile atomically"""
+    dirname = os.path.dirname(os.path.abspath(fname))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".aristaeos.", suffix=".prom.tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fobj:
+        fobj.write(toPrometheus(stats, device))
+    os.chmod(tmpname, 0o644)
+    os.replace(tmpname, fname)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Parsed running config with path index, parsed once and queried many times.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/07
+"""
+
+
+class ConfigTree:
+    """Running config parsed to NetworkConfig, objects indexed by parents path"""
+
+    def __init__(self, text):
+        # netcommon config parser is loaded only when a tree is built
+        from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import \
+            NetworkConfig  # pylint: disable=import-outside-toplevel
+
+        self.text = text
+        self.config = NetworkConfig(contents=text, indent=1)
+        self.index = {}
+        for item in self.config.items:
+            self.index[tuple(item.parents) + (item.text,)] = item
+
+    def getObject(self, parents):
+        """Get config object of parents path (None if not present)"""
+        return self.index.get(tuple(parents))
+
+    def section(self, parents):
+        """Get parents and direct children lines, same format as get_sublevel_config"""
+        obj = self.getObject(parents)
+        contents = list(parents) + (obj.children if obj else [])
+        return "\n".join(line if idx == 0 else f" {line}" for idx, line in enumerate(contents))
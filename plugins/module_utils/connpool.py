@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Registry of warm persistent connections, shared across forks.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/10
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+
+class ConnectionPool:
+    """Pool of persistent connection sockets. Each socket is stored with its key
+    of (host, port, user) and credentials (password, become, become password), so
+    a socket is reused only by tasks with the same credentials and privilege level.
+    Sockets in use by a task are marked busy (refcount set by acquire and cleared
+    by release) and are never evicted. maxPerHost limits warm (idle) sockets of one
+    host over all keys. State is kept in a json registry file protected by flock,
+    so all forks of a playbook run (and following runs) share it."""
+
+    def __init__(self, registry, maxPerHost=2, idleTimeout=30):
+        self.registry = registry
+        self.maxPerHost = maxPerHost
+        self.idleTimeout = idleTimeout
+
+    @staticmethod
+    def key(host, port, user, auth=None):
+        """Get pool key. auth (e.g. password, become, become password) is stored
+        only as a salted slow hash"""
+        ident = f"{host}:{port}:{user}"
+        secret = json.dumps(auth, sort_keys=True, default=str).encode("utf-8")
+        digest = hashlib.pbkdf2_hmac("sha256", secret, ident.encode("utf-8"), 10000).hex()[:32]
+        return f"{ident}:{digest}"
+
+    def _update(self, func):
+        """Run func(entries) under exclusive lock and store modified entries"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.registry)), exist_ok=True)
+        with open(self.registry, "a+", encoding="utf-8") as fd:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                fd.seek(0)
+                try:
+                    entries = json.loads(fd.read() or "{}")
+                except ValueError:
+                    entries = {}
+                out = func(entries)
+                fd.seek(0)
+                fd.truncate()
+                fd.write(json.dumps(entries))
+                fd.flush()
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        return out
+
+    def healthy(self, entry, now=None):
+        """Check that connection is alive: socket exists and it is in use or it was
+        not idle long enough for the persistent connection process to exit"""
+        now = now or time.time()
+        if not os.path.exists(entry["socket"]):
+            return False
+        return entry.get("busy", 0) > 0 or now - entry["lastUsed"] < self.idleTimeout
+
+    def _evict(self, entries, now):
+        """Remove unhealthy entries and keep at most maxPerHost idle entries per host.
+        Busy entries are kept (socket is in use by a running task)"""
+        evicted = []
+        for sock in list(entries):
+            if not self.healthy(entries[sock], now):
+                evicted.append(entries.pop(sock))
+        perHost = {}
+        for sock, entry in entries.items():
+            if not entry.get("busy", 0):
+                perHost.setdefault(entry["host"], []).append(sock)
+        for socks in perHost.values():
+            socks.sort(key=lambda sock: entries[sock]["lastUsed"])
+            while len(socks) > self.maxPerHost:
+                evicted.append(entries.pop(socks.pop(0)))
+        return evicted
+
+    def acquire(self, host, port, user, auth=None):
+        """Get healthy pooled entry (socket, atExec) or None. Entry is marked busy
+        until it is released (pass its socket as held to release)"""
+        key = self.key(host, port, user, auth)
+
+        def _acquire(entries):
+            now = time.time()
+            self._evict(entries, now)
+            found = [entry for entry in entries.values() if entry["key"] == key]
+            if not found:
+                return None
+            entry = max(found, key=lambda entry: entry["lastUsed"])
+            entry["lastUsed"] = now
+            entry["busy"] = entry.get("busy", 0) + 1
+            return dict(entry)
+
+        return self._update(_acquire)
+
+    def release(self, host, port, user, socket, atExec, auth=None, held=None):
+        """Store connection in pool and record if session is left at exec prompt.
+        held is the socket returned by acquire (its busy mark is cleared).
+        Returns list of entries evicted (idle replaced sockets of the same key and
+        idle entries over per host limit)"""
+        key = self.key(host, port, user, auth)
+
+        def _release(entries):
+            now = time.time()
+            if held in entries:
+                entries[held]["busy"] = max(entries[held].get("busy", 0) - 1, 0)
+            busy = entries[socket].get("busy", 0) if socket in entries else 0
+            entries[socket] = {
+                "key": key,
+                "host": host,
+                "socket": socket,
+                "atExec": atExec,
+                "lastUsed": now,
+                "busy": busy,
+            }
+            evicted = []
+            for sock in list(entries):
+                entry = entries[sock]
+                if sock != socket and entry["key"] == key and not entry.get("busy", 0):
+                    evicted.append(entries.pop(sock))
+            evicted += self._evict(entries, now)
+            return evicted
+
+        return self._update(_release)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""JSON decoding of device responses with fastest available codec.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/04
+"""
+import json
+import time
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ujson
+
+    HAS_UJSON = True
+except ImportError:
+    HAS_UJSON = False
+
+if HAS_ORJSON:
+    CODEC = "orjson"
+    _loads = orjson.loads
+elif HAS_UJSON:
+    CODEC = "ujson"
+    _loads = ujson.loads
+else:
+    CODEC = "json"
+    _loads = json.loads
+
+# Per command decode statistics of this module run
+DECODE_STATS = {}
+
+
+def loads(data):
+    """Decode json from str or bytes with the selected codec"""
+    return _loads(data)
+
+
+def getSize(data):
+    """Get size of response in bytes (utf-8 encoded size of str). ASCII str size
+    is known without encoding, so only non ASCII responses are encoded"""
+    if not data:
+        return 0
+    if isinstance(data, bytes) or data.isascii():
+        return len(data)
+    return len(data.encode("utf-8", errors="surrogateescape"))
+
+
+def decode(name, data):
+    """Decode json response and record size and decode time under name.
+    Raises ValueError (or codec specific subclass) on invalid input"""
+    stats = DECODE_STATS.setdefault(
+        name, {"bytes": 0, "decode_seconds": 0.0, "count": 0, "errors": 0, "codec": CODEC}
+    )
+    size = getSize(data)
+    start = time.perf_counter()
+    try:
+        return loads(data)
+    except Exception:
+        stats["errors"] += 1
+        raise
+    finally:
+        stats["bytes"] += size
+        stats["decode_seconds"] += time.perf_counter() - start
+        stats["count"] += 1
+
+
+def getStats():
+    """Get per command decode statistics rounded for reporting"""
+    out = {}
+    for name, stats in DECODE_STATS.items():
+        out[name] = dict(stats, decode_seconds=round(stats["decode_seconds"], 6))
+    return out
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Canonical interface and MAC keys shared by fact parsers.
+Interface names (Et1/1, eth1/1, Ethernet1/1) and MACs (aaaa.bbbb.cccc,
+AA:BB:CC:DD:EE:FF) are normalized once and cached, so joins between sources
+are dict lookups.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/14
+"""
+import re
+
+# Lower case interface name prefix (full and abbreviated) -> EOS name
+INTERFACE_PREFIXES = {
+    "et": "Ethernet",
+    "eth": "Ethernet",
+    "ethernet": "Ethernet",
+    "po": "Port-Channel",
+    "port-channel": "Port-Channel",
+    "portchannel": "Port-Channel",
+    "vl": "Vlan",
+    "vlan": "Vlan",
+    "ma": "Management",
+    "mgmt": "Management",
+    "management": "Management",
+    "lo": "Loopback",
+    "loopback": "Loopback",
+    "vx": "Vxlan",
+    "vxlan": "Vxlan",
+    "tu": "Tunnel",
+    "tunnel": "Tunnel",
+}
+
+# Abbreviation registered for each EOS name
+INTERFACE_SHORT = {"Ethernet": "Et", "Port-Channel": "Po", "Vlan": "Vl", "Management": "Ma", "Loopback": "Lo"}
+
+INTERFACE_RE = re.compile(r"^([A-Za-z][A-Za-z\-]*?)\s*(\d[\d/.:]*)$")
+MAC_STRIP = str.maketrans("", "", ".:-")
+
+
+def canonicalInterface(name):
+    """Get EOS interface name of name (unknown formats are returned unchanged)"""
+    match = INTERFACE_RE.match(name.strip())
+    if not match:
+        return name
+    prefix = INTERFACE_PREFIXES.get(match.group(1).lower())
+    return f"{prefix}{match.group(2)}" if prefix else name
+
+
+def canonicalMac(mac):
+    """Get lowercase colon separated mac (non mac values are returned unchanged)"""
+    tmp = mac.translate(MAC_STRIP).lower()
+    if len(tmp) != 12:
+        return mac
+    try:
+        int(tmp, 16)
+    except ValueError:
+        return mac
+    return ":".join((tmp[0:2], tmp[2:4], tmp[4:6], tmp[6:8], tmp[8:10], tmp[10:12]))
+
+
+class KeyIndex:
+    """Alias -> canonical key cache of interfaces and macs"""
+
+    def __init__(self):
+        self.interfaces = {}
+        self.macs = {}
+        self.known = set()
+
+    def register(self, names):
+        """Register device interface names and precompute their aliases"""
+        for name in names:
+            canonical = self.interface(name)
+            self.known.add(canonical)
+            match = INTERFACE_RE.match(canonical)
+            if match and match.group(1) in INTERFACE_SHORT:
+                short = INTERFACE_SHORT[match.group(1)]
+                self.interfaces[f"{short}{match.group(2)}"] = canonical
+                self.interfaces[f"{short.lower()}{match.group(2)}"] = canonical
+        # Single lane ports are reported as EthernetN by some sources, EthernetN/1 by device
+        for canonical in list(self.known):
+            if canonical.startswith("Ethernet") and canonical.endswith("/1"):
+                base = canonical[:-2]
+                if "/" not in base[8:] and base not in self.known and f"{base}/2" not in self.known:
+                    self.interfaces[base] = canonical
+
+    def interface(self, name):
+        """Get canonical interface name"""
+        try:
+            return self.interfaces[name]
+        except KeyError:
+            canonical = self.interfaces[name] = canonicalInterface(name)
+            return canonical
+
+    def mac(self, value):
+        """Get canonical mac"""
+        try:
+            return self.macs[value]
+        except KeyError:
+            canonical = self.macs[value] = canonicalMac(value)
+            return canonical
+
+    def clear(self):
+        """Drop all cached keys"""
+        self.interfaces.clear()
+        self.macs.clear()
+        self.known.clear()
+
+
+# Key index of this module run, shared by all parsers
+KEY_INDEX = KeyIndex()
@@ -10,17 +10,25 @@ Email                   : juztas (at) gmail.com
 @Copyright              : General Public License v3.0+
 Date                    : 2023/11/05
 """
+import re
+import time
+
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import env_fallback
-from ansible.module_utils.connection import exec_command
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
-    ConfigLine, NetworkConfig)
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
-    ComplexList, to_list)
+from ansible.module_utils.connection import (Connection, ConnectionError,
+                                             exec_command)
+from ansible_collections.sense.aristaeos.plugins.module_utils import collstats, jsoncodec
+from ansible_collections.sense.aristaeos.plugins.module_utils.configtree import \
+    ConfigTree
 from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import \
     functionwrapper
+from ansible_collections.sense.aristaeos.plugins.module_utils.scheduler import (
+    classify, scheduled, scheduler_spec)
+
+COMMAND_KEYS = ("command", "prompt", "answer")
 
-_DEVICE_CONFIGS = {}
+# Exec mode commands which change running config (cached config is invalidated)
+CONFIG_CHANGE_RE = re.compile(r"^(configure (replace|session)|copy \S+ running-config|rollback)")
 
 WARNING_PROMPTS_RE = [
     r"[\r\n]?\[yes/no\]:\s?$",
@@ -48,7 +56,8 @@ aristaeos_provider_spec = {
     "timeout": {"type": "int"},
 }
 aristaeos_argument_spec = {
-    "provider": {"type": "dict", "options": aristaeos_provider_spec}
+    "provider": {"type": "dict", "options": aristaeos_provider_spec},
+    "scheduler": {"type": "dict", "options": scheduler_spec},
 }
 
 
@@ -58,53 +67,110 @@ def check_args(module, warnings):
     pass
 
 
+@functionwrapper
+def invalidate_config(module):
+    """Drop running config cached in persistent connection (no-op without cliconf cache)"""
+    try:
+        Connection(module._socket_path).invalidate_config()
+    except ConnectionError:
+        pass
+
+
+@functionwrapper
+def _get_config(module, flags, cmd):
+    """Get running config from persistent connection cache, or run show command"""
+    try:
+        return 0, Connection(module._socket_path).get_config(flags=flags), ""
+    except ConnectionError:
+        return exec_command(module, cmd)
+
+
 @functionwrapper
 def get_config(module, flags=None):
-    """Get running config"""
+    """Get running config. Config is cached in the persistent connection
+    process (cliconf), shared by all tasks on the same device"""
     flags = [] if flags is None else flags
 
     cmd = "show running-config " + " ".join(flags)
     cmd = cmd.strip()
 
-    try:
-        return _DEVICE_CONFIGS[cmd]
-    except KeyError:
-        ret, out, err = exec_command(module, cmd)
-        if ret != 0:
-            module.fail_json(
-                msg="unable to retrieve current config",
-                stderr=to_text(err, errors="surrogate_or_strict"),
-            )
-        cfg = to_text(out, errors="surrogate_or_strict").strip()
-        _DEVICE_CONFIGS[cmd] = cfg
-        return cfg
+    with scheduled(module, classify(cmd)):
+        start = time.perf_counter()
+        ret, out, err = _get_config(module, flags, cmd)
+    collstats.record(cmd, time.perf_counter() - start, len(out or ""), ret != 0)
+    if ret != 0:
+        module.fail_json(
+            msg="unable to retrieve current config",
+            stderr=to_text(err, errors="surrogate_or_strict"),
+        )
+    return to_text(out, errors="surrogate_or_strict").strip()
+
+
+@functionwrapper
+def to_list(val):
+    """Transform value to list"""
+    if isinstance(val, (list, tuple, set)):
+        return list(val)
+    if val is not None:
+        return [val]
+    return []
 
 
 @functionwrapper
 def to_commands(module, commands):
-    """Transform commands"""
-    spec = {"command": {"key": True}, "prompt": {}, "answer": {}}
-    transform = ComplexList(spec, module)
-    return transform(commands)
+    """Transform commands to dicts with command, prompt and answer keys.
+    Same result as netcommon ComplexList, without loading netcommon utils (and jinja2)"""
+    out = []
+    for item in commands:
+        if not isinstance(item, dict):
+            item = {"command": item}
+        unknown = set(item).difference(COMMAND_KEYS)
+        if unknown:
+            module.fail_json(msg=f"One or more invalid keys: {', '.join(sorted(unknown))}")
+        if item.get("command") is None:
+            module.fail_json(msg="missing required key: command")
+        out.append({key: item.get(key) for key in COMMAND_KEYS})
+    return out
 
 
 @functionwrapper
-def run_commands(module, commands, check_rc=True):
-    """Run Commands"""
+def run_commands(module, commands, check_rc=True, raw=False, retry=False):
+    """Run Commands. If raw is set, responses are returned as received
+    from connection, without text conversion, to be decoded at parse time.
+    exec_command over JSON-RPC always returns str, so raw only skips to_text
+    (bytes are not received); sizes are recorded as utf-8 encoded bytes.
+    retry is set by callers which execute commands again after a failed attempt"""
     responses = []
     commands = to_commands(module, to_list(commands))
     for cmd in commands:
+        name = cmd["command"]
+        pclass = classify(name)
         cmd = module.jsonify(cmd)
-        ret, out, err = exec_command(module, cmd)
+        with scheduled(module, pclass):
+            start = time.perf_counter()
+            ret, out, err = exec_command(module, cmd)
+        collstats.record(name, time.perf_counter() - start, jsoncodec.getSize(out), ret != 0, retry)
+        if CONFIG_CHANGE_RE.match(name):
+            invalidate_config(module)
         if check_rc and ret != 0:
             module.fail_json(msg=to_text(err, errors="surrogate_or_strict"), rc=ret)
-        responses.append(to_text(out, errors="surrogate_or_strict"))
+        responses.append(out if raw else to_text(out, errors="surrogate_or_strict"))
     return responses
 
 
 @functionwrapper
 def load_config(module, commands):
-    """Load config"""
+    """Load config, config session holds a device scheduler slot"""
+    with scheduled(module, "config"):
+        try:
+            _load_config(module, commands)
+        finally:
+            invalidate_config(module)
+
+
+@functionwrapper
+def _load_config(module, commands):
+    """Load config in configure terminal session"""
     ret, _out, err = exec_command(module, "configure terminal")
     if ret != 0:
         module.fail_json(
@@ -126,22 +192,11 @@ def load_config(module, commands):
 
 @functionwrapper
 def get_sublevel_config(running_config, module):
-    """Get sublevel config"""
-    contents = []
-    current_config_contents = []
-    running_config = NetworkConfig(contents=running_config, indent=1)
-    obj = running_config.get_object(module.params["parents"])
-    if obj:
-        contents = obj.children
-    contents[:0] = module.params["parents"]
-
-    indent = 0
-    for cts in contents:
-        if isinstance(cts, str):
-            current_config_contents.append(cts.rjust(len(cts) + indent, " "))
-        if isinstance(cts, ConfigLine):
-            current_config_contents.append(cts.raw)
-        indent = 1
-    sublevel_config = "\n".join(current_config_contents)
-
-    return sublevel_config
+    """Get sublevel config of module parents. Without running_config, it is
+    taken from config tree parsed once in persistent connection"""
+    if running_config is None:
+        try:
+            return Connection(module._socket_path).get_config_section(module.params["parents"])
+        except ConnectionError:
+            running_config = get_config(module)
+    return ConfigTree(running_config).section(module.params["parents"])
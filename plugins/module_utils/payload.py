@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Compact transport of large fact payloads.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/02
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zlib
+
+large_facts_spec = {
+    "mode": {"default": "inline", "choices": ["inline", "compress", "file"]},
+    "threshold": {"default": 65536, "type": "int"},
+    "path": {"type": "path"},
+    "host": {"type": "str"},
+}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def serialize(value):
+    """Serialize fact value to bytes"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=list).encode("utf-8")
+
+
+def getFileHost(module, host=None):
+    """Get host identity used in file names, so hosts sharing one output directory do
+    not overwrite each other files: host (set by action plugin to inventory host) or
+    name of persistent connection socket"""
+    host = host or os.path.basename(getattr(module, "_socket_path", None) or "") or "localhost"
+    return re.sub(r"[^\w\-.]+", "_", host)
+
+
+def writeFile(path, name, data):
+    """Write gzip compressed data to path/name atomically and return file name"""
+    os.makedirs(path, exist_ok=True)
+    fname = os.path.join(path, f"{name}.json.gz")
+    fd, tmpname = tempfile.mkstemp(dir=path, prefix=f".{name}.")
+    try:
+        with os.fdopen(fd, "wb") as fobj:
+            fobj.write(gzip.compress(data))
+        os.replace(tmpname, fname)
+    except Exception:
+        os.unlink(tmpname)
+        raise
+    return fname
+
+
+def writeStream(fname, data, maxSize=None, compress=False, chunkSize=CHUNK_SIZE):
+    """Write text or bytes data to file in chunks, optionally gzip compressed and
+    capped to maxSize bytes (of uncompressed data). Returns path, size, sha256 and
+    truncated flag of the written data"""
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="surrogateescape")
+    view = memoryview(data)
+    if maxSize is not None:
+        view = view[:maxSize]
+    dirname = os.path.dirname(os.path.abspath(fname))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".stream.")
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as rawobj:
+            fobj = gzip.GzipFile(fileobj=rawobj, mode="wb") if compress else rawobj
+            for idx in range(0, len(view), chunkSize):
+                chunk = view[idx : idx + chunkSize]
+                digest.update(chunk)
+                fobj.write(chunk)
+            if compress:
+                fobj.close()
+        os.replace(tmpname, fname)
+    except Exception:
+        os.unlink(tmpname)
+        raise
+    return {
+        "path": fname,
+        "size": len(view),
+        "sha256": digest.hexdigest(),
+        "truncated": len(view) < len(data),
+    }
+
+
+def packValue(name, value, options):
+    """Pack a single fact value. Returns value unchanged if it is below threshold"""
+    data = serialize(value)
+    if options["mode"] == "inline" or len(data) < options["threshold"]:
+        return value
+    out = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+    if options["mode"] == "compress":
+        out["encoding"] = "zlib+base64"
+        out["data"] = base64.b64encode(zlib.compress(data)).decode("ascii")
+    else:
+        out["encoding"] = "gzip"
+        prefix = f"{options['host']}_" if options.get("host") else ""
+        out["path"] = writeFile(options["path"], f"{prefix}{name}", data)
+    return out
+
+
+def packFacts(facts, options):
+    """Pack all large facts according to options (see large_facts_spec). In file
+    mode, file names are prefixed with options host"""
+    if not options or options["mode"] == "inline":
+        return facts
+    return {key: packValue(key, value, options) for key, value in facts.items()}
+
+
+def unpackValue(value):
+    """Restore a fact value packed by packValue"""
+    if not isinstance(value, dict) or value.get("encoding") not in ["zlib+base64", "gzip"]:
+        return value
+    if value["encoding"] == "zlib+base64":
+        data = zlib.decompress(base64.b64decode(value["data"]))
+    else:
+        with gzip.open(value["path"], "rb") as fobj:
+            data = fobj.read()
+    if hashlib.sha256(data).hexdigest() != value["sha256"]:
+        raise ValueError(f"Checksum mismatch for packed fact {value.get('path', '')}")
+    return json.loads(data)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Compact fact records: tuple records with interned repeated strings,
+converted to fact dicts (or columns) only when facts are emitted.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/16
+"""
+import sys
+from collections import namedtuple
+
+# Route record (no per record dict); intf and to are None if not present
+Route = namedtuple("Route", ["vrf", "prefix", "intf", "to"])
+
+ROUTE_COLUMNS = ["vrf", "from", "intf", "to"]
+
+
+def intern(value):
+    """Get interned string (other values are returned unchanged)"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def routeToDict(route):
+    """Get route fact dict of route record"""
+    out = {"vrf": route.vrf, "from": route.prefix}
+    if route.intf:
+        out["intf"] = route.intf
+    if route.to:
+        out["to"] = route.to
+    return out
+
+
+def routesToDicts(routes):
+    """Replace route records with fact dicts in place (records are freed while converting)"""
+    for idx, route in enumerate(routes):
+        routes[idx] = routeToDict(route)
+    return routes
+
+
+def routesToColumns(routes):
+    """Get columnar routes: {"columns": [...], "vrf": [...], "from": [...], ...}"""
+    out = {"columns": list(ROUTE_COLUMNS)}
+    for name, vals in zip(ROUTE_COLUMNS, zip(*routes) if routes else [[]] * len(ROUTE_COLUMNS)):
+        out[name] = list(vals)
+    return out
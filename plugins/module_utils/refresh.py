@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Local store of parsed command fragments with per command freshness intervals.
+Each subset command is parsed to a fragment (the part of the response which is
+used by subset facts). Only stale commands are fetched, fresh fragments are
+served from the store. Intervals adapt to observed changes of fragments (volatile
+counters, uptime and timestamps of raw responses are not part of fragments):
+shorter when a fragment changes, longer when it is stable. Entries are keyed by
+(subset, command), raw responses are not stored.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/04
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import jsoncodec
+
+STORE_VERSION = 3
+
+refresh_spec = {
+    "store": {"required": True, "type": "path"},
+    "intervals": {"type": "dict"},
+    "adaptive": {"default": True, "type": "bool"},
+    "force": {"default": False, "type": "bool"},
+}
+
+# Adaptive interval is kept between declared interval * MIN_FACTOR and * MAX_FACTOR
+MIN_FACTOR = 0.25
+MAX_FACTOR = 4.0
+# Interval change on changed (SHRINK) or unchanged (GROW) fragment
+SHRINK = 0.5
+GROW = 1.5
+
+
+class RefreshStore:
+    """Command fragments of one device, fetch times and adaptive intervals,
+    as {subset: {command: {fetched, interval, sha256, data}}}"""
+
+    def __init__(self, fname, options=None):
+        options = options or {}
+        self.fname = fname
+        self.overrides = options.get("intervals") or {}
+        self.adaptive = options.get("adaptive", True)
+        self.force = options.get("force", False)
+        self.subsets = {}
+        self.report = {}
+        self.now = time.time()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, fname, options=None):
+        """Load store from file, empty store if it is not available"""
+        store = cls(fname, options)
+        try:
+            with open(fname, "rb") as fd:
+                data = jsoncodec.loads(fd.read())
+        except (OSError, ValueError):
+            return store
+        if isinstance(data, dict) and data.get("version") == STORE_VERSION:
+            store.subsets = data.get("subsets", {})
+        return store
+
+    def save(self):
+        """Save store to file atomically (only if anything was fetched)"""
+        if not self.dirty:
+            return
+        dirname = os.path.dirname(os.path.abspath(self.fname))
+        os.makedirs(dirname, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".refresh.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fobj:
+            json.dump({"version": STORE_VERSION, "subsets": self.subsets}, fobj, separators=(",", ":"), default=str)
+        os.replace(tmpname, self.fname)
+
+    def getEntry(self, subset, cmd):
+        """Get stored entry of subset command (None if not stored)"""
+        return self.subsets.get(subset, {}).get(cmd)
+
+    def getDeclared(self, subset, cmd, declared):
+        """Get declared interval of command, user overrides by command or subset name"""
+        return float(self.overrides.get(cmd, self.overrides.get(subset, declared)))
+
+    def isStale(self, subset, cmd, declared):
+        """Check if command has to be fetched from device"""
+        declared = self.getDeclared(subset, cmd, declared)
+        entry = self.getEntry(subset, cmd)
+        if self.force or declared <= 0 or not entry:
+            return True
+        interval = entry.get("interval", declared) if self.adaptive else declared
+        return self.now - entry["fetched"] >= interval
+
+    def getFragment(self, subset, cmd):
+        """Get stored fragment of subset command (None if not stored)"""
+        entry = self.getEntry(subset, cmd)
+        return entry["data"] if entry else None
+
+    def update(self, subset, cmd, declared, fragment):
+        """Store fragment of subset command fetched in this run and adapt its interval"""
+        declared = self.getDeclared(subset, cmd, declared)
+        digest = hashlib.sha256(json.dumps(fragment, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        entry = self.getEntry(subset, cmd)
+        interval = declared
+        if entry and self.adaptive:
+            interval = entry.get("interval", declared) * (SHRINK if entry.get("sha256") != digest else GROW)
+            interval = min(max(interval, declared * MIN_FACTOR), declared * MAX_FACTOR)
+        self.subsets.setdefault(subset, {})[cmd] = {
+            "fetched": self.now,
+            "interval": interval,
+            "sha256": digest,
+            "data": fragment,
+        }
+        self.dirty = True
+
+    def record(self, subset, cmd, fetched):
+        """Record freshness of subset command served in this run"""
+        entry = self.getEntry(subset, cmd) or {}
+        self.report.setdefault(subset, {})[cmd] = {
+            "fetched": fetched,
+            "age": round(self.now - entry.get("fetched", self.now), 3),
+            "interval": entry.get("interval", 0),
+        }
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Index of VLAN and port resources built from aristaeos_facts output.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/25
+"""
+from ansible_collections.sense.aristaeos.plugins.module_utils import \
+    vlanbitmap
+
+
+def getInterfaces(devfacts):
+    """Get interfaces facts from aristaeos_facts result, ansible_facts or hostvars"""
+    if "ansible_facts" in devfacts:
+        devfacts = devfacts["ansible_facts"]
+    if "ansible_net_interfaces" in devfacts:
+        return devfacts["ansible_net_interfaces"] or {}
+    return devfacts.get("net_interfaces", devfacts.get("interfaces", {})) or {}
+
+
+class PortResources:
+    """Resources of one port"""
+
+    __slots__ = ("device", "port", "used", "allowed", "bandwidth", "up", "switchport")
+
+    def __init__(self, device, port, vals):
+        self.device = device
+        self.port = port
+        self.used = vlanbitmap.parseRanges(vals.get("vlans", ""))
+        self.allowed = vlanbitmap.parseRanges(vals["allowed_vlans"]) if "allowed_vlans" in vals else None
+        self.bandwidth = vals.get("bandwidth", 0) or 0
+        self.up = vals.get("operstatus", "connected") in ["connected", "up"]
+        self.switchport = vals.get("switchport") == "yes" or self.allowed is not None
+
+
+class ResourceIndex:
+    """Index built once from {device: facts} map, answers allocation queries
+    with dict lookups and bitmap operations only"""
+
+    def __init__(self, devices):
+        self.ports = {}
+        self.byDevice = {}
+        for device, devfacts in devices.items():
+            interfaces = getInterfaces(devfacts)
+            for port, vals in interfaces.items():
+                res = PortResources(device, port, vals)
+                self.ports[(device, port)] = res
+                self.byDevice.setdefault(device, []).append(res)
+            # Old facts report membership only as tagged list under VlanN
+            for port, vals in interfaces.items():
+                if port.startswith("Vlan") and port[4:].isdigit():
+                    bit = vlanbitmap.fromRange(port[4:], port[4:])
+                    for member in vals.get("tagged", []):
+                        if (device, member) in self.ports:
+                            self.ports[(device, member)].used |= bit
+
+    def getPort(self, device, port):
+        """Get port resources, raises KeyError if port is unknown"""
+        return self.ports[(device, port)]
+
+    def freeVlans(self, path, pool=vlanbitmap.ALL_VLANS, withinAllowed=False):
+        """Get bitmap of VLANs unused on every (device, port) of path.
+        withinAllowed also requires VLAN to be in allowed vlans of trunk ports"""
+        free = pool
+        for device, port in path:
+            res = self.getPort(device, port)
+            free &= ~res.used
+            if withinAllowed and res.allowed is not None:
+                free &= res.allowed
+        return free
+
+    def spareBandwidth(self, minBandwidth=0, devices=None, reserved=None, upOnly=True):
+        """Get ports with spare bandwidth (port bandwidth minus reserved) of at
+        least minBandwidth (Mbps). reserved is {device: {port: Mbps}}"""
+        reserved = reserved or {}
+        out = []
+        for device in devices or self.byDevice:
+            for res in self.byDevice.get(device, []):
+                if upOnly and not res.up:
+                    continue
+                spare = res.bandwidth - reserved.get(device, {}).get(res.port, 0)
+                if spare >= minBandwidth and spare > 0:
+                    out.append({"device": device, "port": res.port, "bandwidth": res.bandwidth, "spare": spare})
+        return out
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Staged parallel config rollout to many devices (waves, verify, rollback).
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/02
+"""
+import itertools
+import json
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils._text import to_text
+from ansible_collections.sense.aristaeos.plugins.module_utils.checkpoint import (
+    getCheckpointName, pruneCheckpoints, restoreCheckpoint, saveCheckpoint)
+from ansible_collections.sense.aristaeos.plugins.module_utils.configtree import \
+    ConfigTree
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import (
+    load_config, run_commands)
+from ansible_collections.sense.aristaeos.plugins.module_utils.scheduler import \
+    scheduler_spec
+from ansible_collections.sense.aristaeos.plugins.module_utils.verify import \
+    verifyConfig
+
+rollout_spec = {
+    "hosts": {"required": True, "type": "list", "elements": "str"},
+    "lines": {"type": "list", "elements": "str"},
+    "host_lines": {"type": "dict"},
+    "waves": {"default": [1, "25%", "100%"], "type": "list"},
+    "concurrency": {"default": 10, "type": "int"},
+    "verify": {
+        "type": "list",
+        "elements": "dict",
+        "options": {
+            "command": {"required": True, "type": "str"},
+            "regexp": {"required": True, "type": "str"},
+        },
+    },
+    "verify_lines": {"default": True, "type": "bool"},
+    "on_failure": {"default": "rollback", "choices": ["halt", "rollback", "continue"]},
+    "rollback_scope": {"default": "wave", "choices": ["wave", "all"]},
+    "max_failures": {"default": 0, "type": "int"},
+    "backup_name": {"type": "str"},
+    "backup_retention": {"default": 5, "type": "int"},
+    "scheduler": {"type": "dict", "options": scheduler_spec},
+}
+
+
+class RolloutError(Exception):
+    """Device operation failed during rollout"""
+
+
+class DeviceSession:
+    """Minimal module-like object, so module_utils helpers run against a
+    persistent connection socket outside of a module process"""
+
+    def __init__(self, host, socketPath, params=None):
+        self.host = host
+        self._socket_path = socketPath
+        self.params = params or {}
+
+    @staticmethod
+    def jsonify(data):
+        """Serialize command dict"""
+        return json.dumps(data)
+
+    def fail_json(self, **kwargs):
+        """Raise instead of exiting process"""
+        raise RolloutError(f"{self.host}: {to_text(kwargs.get('msg', 'failed'))}")
+
+
+def planWaves(hosts, waves):
+    """Split hosts into waves. Wave is number of hosts or cumulative
+    percentage ('25%') of all hosts. Last wave always includes remaining hosts"""
+    out = []
+    done = 0
+    total = len(hosts)
+    for wave in waves:
+        wave = str(wave).strip()
+        if wave.endswith("%"):
+            target = math.ceil(total * float(wave[:-1]) / 100)
+        else:
+            target = done + int(wave)
+        target = min(max(target, done + 1), total)
+        if target > done:
+            out.append(hosts[done:target])
+            done = target
+    if done < total:
+        out.append(hosts[done:])
+    return out
+
+
+# Top level lines which enter a config context, flat lines after them are its children
+CONTEXT_RE = re.compile(
+    r"^(interface|router|vlan|vrf instance|ip access-list|ipv6 access-list|route-map"
+    r"|mlag configuration|management|monitor session)(\s|$)"
+)
+
+
+def getVerifyItems(lines):
+    """Get config objects expected after apply (for section scoped verification).
+    Indented lines keep their indentation, flat lines following a context line
+    (interface, router, ...) are its children until 'exit' or next context line"""
+    out = []
+    context = False
+    for line in lines:
+        text = line.strip()
+        if text in ["exit", "end", "!"]:
+            context = False
+            continue
+        if not text or text.startswith("default "):
+            continue
+        if line[:1].isspace():
+            out.append(line.rstrip())
+            continue
+        if CONTEXT_RE.match(text):
+            context = True
+            out.append(text)
+            continue
+        out.append(f" {text}" if context else text)
+    return ConfigTree("\n".join(out)).config.items if out else []
+
+
+class Rollout:
+    """Apply config to hosts in waves with verification and rollback.
+    connect(host) returns persistent connection socket path of host"""
+
+    def __init__(self, params, connect):
+        self.params = params
+        self.connect = connect
+        self.backup = params["backup_name"] or getCheckpointName("rollout-")
+        self.devices = {}
+        self.sessions = {}
+
+    def getLines(self, host):
+        """Get config lines of host"""
+        return (self.params["host_lines"] or {}).get(host, self.params["lines"]) or []
+
+    def getSession(self, host):
+        """Get (or open) device session"""
+        if host not in self.sessions:
+            scheduler = self.params["scheduler"]
+            if scheduler and not scheduler.get("device"):
+                scheduler = dict(scheduler, device=host)
+            self.sessions[host] = DeviceSession(host, self.connect(host), {"scheduler": scheduler})
+        return self.sessions[host]
+
+    @staticmethod
+    def timed(timing, key, func, *args):
+        """Run func and record its wall time under key"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timing[key] = round(time.perf_counter() - start, 6)
+
+    def verify(self, session, lines):
+        """Run targeted checks. Raises RolloutError on mismatch"""
+        for check in self.params["verify"] or []:
+            out = run_commands(session, [check["command"]])[0]
+            if not re.search(check["regexp"], out, re.M):
+                raise RolloutError(f"{session.host}: verify {check['command']} did not match {check['regexp']}")
+        items = getVerifyItems(lines) if self.params["verify_lines"] else []
+        if items:
+            result = verifyConfig(session, items)
+            if not result["passed"]:
+                missing = [" / ".join(path) for path in result["missing"] + result["unexpected"]]
+                raise RolloutError(f"{session.host}: lines not as expected in running config: {', '.join(missing)}")
+
+    def prune(self, session, device):
+        """Delete oldest rollout checkpoints, keeping backup_retention newest (and this backup)"""
+        try:
+            retention = self.params["backup_retention"]
+            device["pruned"] = pruneCheckpoints(session, "rollout-", retention, keep=self.backup)
+        except Exception as ex:
+            # Not fatal, backup of this run is saved
+            device["prune_msg"] = str(ex)
+
+    def applyDevice(self, host):
+        """Backup, apply and verify one device"""
+        device = self.devices[host] = {"status": "failed", "timing": {}}
+        timing = device["timing"]
+        start = time.perf_counter()
+        try:
+            session = self.timed(timing, "connect", self.getSession, host)
+            lines = self.getLines(host)
+            if self.params["on_failure"] == "rollback":
+                self.timed(timing, "backup", saveCheckpoint, session, self.backup)
+                device["backup"] = self.backup
+                self.prune(session, device)
+            self.timed(timing, "apply", load_config, session, lines)
+            device["status"] = "applied"
+            self.timed(timing, "verify", self.verify, session, lines)
+            device["status"] = "verified"
+        except Exception as ex:
+            device["msg"] = str(ex)
+        timing["total"] = round(time.perf_counter() - start, 6)
+        return device["status"] == "verified"
+
+    def rollbackDevice(self, host):
+        """Restore backup taken before apply"""
+        device = self.devices[host]
+        if "backup" not in device:
+            return
+        try:
+            session = self.getSession(host)
+            # Failed apply may leave session in configuration mode
+            run_commands(session, ["end"], check_rc=False)
+            self.timed(device["timing"], "rollback", restoreCheckpoint, session, device["backup"])
+            device["status"] = "rolled_back"
+        except Exception as ex:
+            device["status"] = "rollback_failed"
+            device["rollback_msg"] = str(ex)
+
+    def runParallel(self, func, hosts):
+        """Run func on hosts with at most concurrency workers"""
+        if not hosts:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.params["concurrency"], len(hosts)))) as executor:
+            return list(executor.map(func, hosts))
+
+    def run(self):
+        """Run rollout, returns result dict"""
+        waves = planWaves(self.params["hosts"], self.params["waves"])
+        result = {"waves": [], "devices": self.devices, "halted": False, "rolled_back": []}
+        applied = []
+        for idx, hosts in enumerate(waves):
+            start = time.perf_counter()
+            oks = self.runParallel(self.applyDevice, hosts)
+            failed = [host for host, ok in zip(hosts, oks) if not ok]
+            applied.extend(hosts)
+            result["waves"].append(
+                {"wave": idx, "hosts": hosts, "failed": failed, "seconds": round(time.perf_counter() - start, 6)}
+            )
+            if len(failed) <= self.params["max_failures"] or self.params["on_failure"] == "continue":
+                continue
+            result["halted"] = True
+            if self.params["on_failure"] == "rollback":
+                scope = hosts if self.params["rollback_scope"] == "wave" else applied
+                self.runParallel(self.rollbackDevice, scope)
+                result["rolled_back"] = [host for host in scope if self.devices[host]["status"] == "rolled_back"]
+            for host in itertools.chain.from_iterable(waves[idx + 1 :]):
+                self.devices[host] = {"status": "skipped", "timing": {}}
+            break
+        result["failed"] = result["halted"] or any(
+            len(wave["failed"]) > self.params["max_failures"] for wave in result["waves"]
+        )
+        return result
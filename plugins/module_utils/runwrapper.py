@@ -9,18 +9,48 @@ Email                   : juztas (at) gmail.com
 @Copyright              : General Public License v3.0+
 Date                    : 2023/11/06
 """
-import inspect
+import sys
 import time
+import types
 
-from ansible.utils.display import Display
 
-display = Display()
+class NullDisplay:
+    """Display used in module processes, all output is dropped"""
+
+    verbosity = 0
+
+    def __getattr__(self, name):
+        return self._noop
+
+    @staticmethod
+    def _noop(*_args, **_kwargs):
+        return None
+
+
+NULL_DISPLAY = NullDisplay()
+
+# Ansible Display, resolved once (on first call after it is loaded)
+DISPLAY = None
+
+
+def getDisplay():
+    """Get ansible Display if it is already loaded (controller side plugins).
+    Modules get shared NullDisplay, so they do not load ansible config on every run.
+    Display is cached, wrapped calls do not create display objects"""
+    global DISPLAY  # pylint: disable=global-statement
+    if DISPLAY is None:
+        mod = sys.modules.get("ansible.utils.display")
+        if mod is None:
+            return NULL_DISPLAY
+        DISPLAY = mod.Display()
+    return DISPLAY
 
 
 def functionwrapper(func):
     """Function wrapper to print start/runtime/end"""
 
     def wrapper(*args, **kwargs):
+        display = getDisplay()
         if display.verbosity > 5:
             display.vvvvvv(
                 f"[WRAPPER][{time.time()}] Enter {func.__qualname__}, {func.__code__.co_filename}"
@@ -42,14 +72,9 @@ def functionwrapper(func):
 
 def classwrapper(cls):
     """Class wrapper to print all functions start/runtime/end"""
-    for name, method in cls.__dict__.items():
-        if callable(method) and name != "__init__":
-            if inspect.isfunction(method):
-                if inspect.signature(method).parameters.get('self'):
-                    setattr(cls, name, functionwrapper(method))
-            elif inspect.ismethod(method):
-                if inspect.signature(method).parameters:
-                    firstParam = next(iter(inspect.signature(method).parameters))
-                    if firstParam == 'self':
-                        setattr(cls, name, functionwrapper(method))
+    for name, method in list(cls.__dict__.items()):
+        if isinstance(method, types.FunctionType) and name != "__init__":
+            code = method.__code__
+            if "self" in code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]:
+                setattr(cls, name, functionwrapper(method))
     return cls
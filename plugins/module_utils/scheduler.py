@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Per device concurrency and rate limit of device commands.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/16
+"""
+import contextlib
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+
+scheduler_spec = {
+    "max_concurrent": {"default": 2, "type": "int"},
+    "heavy_concurrent": {"default": 1, "type": "int"},
+    "rate": {"default": 0.0, "type": "float"},
+    "burst": {"default": 10, "type": "int"},
+    "timeout": {"default": 300.0, "type": "float"},
+    "lock_dir": {"type": "path"},
+    "device": {"type": "str"},
+}
+
+# Commands with large outputs, expensive for device control plane
+HEAVY_COMMANDS_RE = re.compile(
+    r"^show (running-config|startup-config|tech-support|ip route|ipv6 route|ip bgp|ipv6 bgp"
+    r"|mac address-table|interfaces( counters)?( \| json)?$)"
+)
+
+# Token cost, part of bucket (burst) class can not consume and poll interval while waiting.
+# Heavy commands leave the reserve to config and light commands and poll less often,
+# so they yield to them when device is busy.
+PRIORITY_CLASSES = {
+    "config": {"cost": 1, "reserve": 0.0, "poll": 0.05},
+    "light": {"cost": 1, "reserve": 0.0, "poll": 0.05},
+    "heavy": {"cost": 5, "reserve": 0.25, "poll": 0.2},
+}
+
+
+def classify(command):
+    """Get priority class of a command"""
+    if HEAVY_COMMANDS_RE.match(command.strip()):
+        return "heavy"
+    return "light"
+
+
+class DeviceScheduler:
+    """Limits concurrency (flock slots) and rate (token bucket) of commands sent
+    to one device. State lives in lock_dir, so all forks and playbooks share it."""
+
+    def __init__(self, device, options):
+        self.device = re.sub(r"[^\w\-.]", "_", device)
+        self.options = options
+        self.lockDir = options["lock_dir"] or os.path.join(tempfile.gettempdir(), "aristaeos_scheduler")
+        os.makedirs(self.lockDir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.lockDir, f"{self.device}.{name}")
+
+    def _tryTokens(self, pclass):
+        """Take tokens from the bucket. Returns 0 on success, or seconds to wait"""
+        rate = self.options["rate"]
+        if not rate:
+            return 0
+        cls = PRIORITY_CLASSES[pclass]
+        burst = self.options["burst"]
+        with open(self._path("bucket"), "a+", encoding="utf-8") as fd:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                fd.seek(0)
+                try:
+                    state = json.loads(fd.read() or "{}")
+                except ValueError:
+                    state = {}
+                now = time.time()
+                tokens = min(burst, state.get("tokens", burst) + (now - state.get("ts", now)) * rate)
+                need = min(cls["cost"] + cls["reserve"] * burst, burst)
+                wait = 0
+                if tokens >= need:
+                    tokens -= cls["cost"]
+                else:
+                    wait = max((need - tokens) / rate, cls["poll"])
+                fd.seek(0)
+                fd.truncate()
+                fd.write(json.dumps({"tokens": tokens, "ts": now}))
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        return wait
+
+    def _trySlot(self, pclass):
+        """Try to lock a free concurrency slot. Returns open locked file or None"""
+        slots = self.options["max_concurrent"]
+        if pclass == "heavy":
+            slots = min(slots, self.options["heavy_concurrent"])
+        for idx in range(max(slots, 1)):
+            fd = open(self._path(f"slot{idx}"), "a", encoding="utf-8")
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                fd.close()
+        return None
+
+    def acquire(self, pclass):
+        """Wait for free slot and tokens of priority class. Returns locked slot file.
+        Raises TimeoutError"""
+        deadline = time.monotonic() + self.options["timeout"]
+        cls = PRIORITY_CLASSES[pclass]
+        while True:
+            fd = self._trySlot(pclass)
+            wait = cls["poll"]
+            if fd is not None:
+                wait = self._tryTokens(pclass)
+                if not wait:
+                    return fd
+                fd.close()
+            if time.monotonic() + wait > deadline:
+                raise TimeoutError(f"scheduler timeout waiting for {pclass} slot of {self.device}")
+            time.sleep(wait)
+
+    @staticmethod
+    def release(fd):
+        """Release slot"""
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        fd.close()
+
+
+def getDevice(module):
+    """Get device key of scheduler state: device option (set by action plugin to
+    device address), provider host, or socket name as fallback. Socket name
+    depends on controlling process, so it is not shared between playbook runs"""
+    options = module.params.get("scheduler") or {}
+    if options.get("device"):
+        return options["device"]
+    provider = module.params.get("provider") or {}
+    if provider.get("host"):
+        return provider["host"]
+    return os.path.basename(getattr(module, "_socket_path", None) or "") or "default"
+
+
+def getScheduler(module):
+    """Get device scheduler for module, None if scheduler option is not set"""
+    options = module.params.get("scheduler")
+    if not options:
+        return None
+    return DeviceScheduler(getDevice(module), options)
+
+
+@contextlib.contextmanager
+def scheduled(module, pclass):
+    """Run block under device scheduler (no-op if it is not configured)"""
+    scheduler = getScheduler(module)
+    if scheduler is None:
+        yield
+        return
+    try:
+        fd = scheduler.acquire(pclass)
+    except TimeoutError as ex:
+        module.fail_json(msg=str(ex))
+    try:
+        yield
+    finally:
+        scheduler.release(fd)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""Streaming telemetry (gNMI) state of interfaces and LLDP neighbors.
+State is kept in the same shape as aristaeos_facts Default subset produces,
+so facts can be served from the state file instead of polling the device.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/30
+"""
+import json
+import os
+import re
+import tempfile
+import time
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import jsoncodec
+from ansible_collections.sense.aristaeos.plugins.module_utils.keyindex import \
+    KEY_INDEX
+
+STATE_VERSION = 1
+
+# Subscriptions: (path, mode, sample interval in seconds)
+TELEMETRY_PATHS = [
+    ("/interfaces/interface/state/oper-status", "on_change", 0),
+    ("/interfaces/interface/state/admin-status", "on_change", 0),
+    ("/interfaces/interface/state/counters", "sample", 10),
+    ("/lldp/interfaces/interface/neighbors/neighbor/state", "on_change", 0),
+]
+
+# openconfig oper-status -> (operstatus, lineprotocol) as reported by show interfaces
+OPER_STATUS = {
+    "UP": ("connected", "up"),
+    "DOWN": ("notconnect", "down"),
+    "LOWER_LAYER_DOWN": ("notconnect", "lowerLayerDown"),
+    "NOT_PRESENT": ("notconnect", "notPresent"),
+    "DORMANT": ("notconnect", "dormant"),
+    "TESTING": ("notconnect", "testing"),
+    "UNKNOWN": ("notconnect", "unknown"),
+}
+
+# openconfig lldp neighbor state leaf -> lldp fact key
+LLDP_KEYS = {
+    "system-name": "remote_system_name",
+    "port-id": "remote_port_id",
+    "chassis-id": "remote_chassis_id",
+}
+
+_ELEM_RE = re.compile(r"([^/\[]+)((?:\[[^\]]*\])*)")
+_KEY_RE = re.compile(r"\[([^=\]]+)=([^\]]*)\]")
+
+
+def parsePath(path):
+    """Parse gNMI path string 'a/b[name=x]/c' to list of (elem, {key: value})"""
+    out = []
+    for match in _ELEM_RE.finditer(path.strip("/")):
+        if match.group(1):
+            out.append((match.group(1), dict(_KEY_RE.findall(match.group(2)))))
+    return out
+
+
+def getGnmiClient():
+    """Get pygnmi gNMIclient class, None if pygnmi is not installed. Imported only
+    when collector connects, so facts runs (state file only) do not load grpc"""
+    try:
+        from pygnmi.client import \
+            gNMIclient  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return gNMIclient
+
+
+def joinPath(prefix, path):
+    """Join prefix and path strings of a notification"""
+    if prefix:
+        return f"{prefix.rstrip('/')}/{path.lstrip('/')}"
+    return path
+
+
+class TelemetryState:
+    """Interfaces and LLDP state built from telemetry updates"""
+
+    def __init__(self, interfaces=None, lldp=None, updated=0.0):
+        self.interfaces = interfaces or {}
+        self.lldp = lldp or {}
+        self.updated = updated
+        self.changes = 0
+        self.adminDown = set()
+        # Neighbors of each interface keyed by neighbor id; lldp holds the first one
+        # (same as show lldp neighbors facts: one neighbor per local port)
+        self.neighbors = {name: {"": dict(vals)} for name, vals in self.lldp.items()}
+
+    def apply(self, path, value):
+        """Apply one update. Returns True if path is known"""
+        elems = parsePath(path)
+        names = [elem for elem, _ in elems]
+        # Value of container subscription is a dict of leafs
+        if isinstance(value, dict):
+            known = False
+            for leaf, leafval in value.items():
+                known |= self.apply(f"{path.rstrip('/')}/{leaf.split(':')[-1]}", leafval)
+            return known
+        if names[:2] == ["interfaces", "interface"] and len(names) >= 4:
+            return self.applyInterface(elems[1][1].get("name"), names[2:], value)
+        if names[:3] == ["lldp", "interfaces", "interface"] and len(names) >= 7:
+            return self.applyLldp(elems[2][1].get("name"), elems[4][1].get("id", ""), names[6], value)
+        return False
+
+    def applyInterface(self, name, leafs, value):
+        """Apply interface state update"""
+        if not name or leafs[0] != "state":
+            return False
+        name = KEY_INDEX.interface(name)
+        intf = self.interfaces.setdefault(name, {})
+        if leafs[1:] == ["oper-status"]:
+            operstatus, lineprotocol = OPER_STATUS.get(str(value).upper(), ("notconnect", str(value).lower()))
+            intf["lineprotocol"] = lineprotocol
+            intf["operstatus"] = "disabled" if name in self.adminDown else operstatus
+        elif leafs[1:] == ["admin-status"]:
+            if str(value).upper() == "DOWN":
+                self.adminDown.add(name)
+                intf["operstatus"] = "disabled"
+            else:
+                self.adminDown.discard(name)
+                if intf.get("operstatus") == "disabled":
+                    intf["operstatus"] = OPER_STATUS.get(intf.get("lineprotocol", "").upper(), ("notconnect",))[0]
+        elif len(leafs) == 3 and leafs[1] == "counters":
+            intf.setdefault("counters", {})[leafs[2]] = int(value)
+            return True
+        else:
+            return False
+        self.changes += 1
+        return True
+
+    def applyLldp(self, name, neighborId, leaf, value):
+        """Apply lldp neighbor state update"""
+        if not name or leaf not in LLDP_KEYS:
+            return False
+        name = KEY_INDEX.interface(name)
+        if LLDP_KEYS[leaf] == "remote_chassis_id":
+            value = KEY_INDEX.mac(str(value))
+        neighbor = self.neighbors.setdefault(name, {}).setdefault(neighborId, {"local_port_id": name})
+        neighbor[LLDP_KEYS[leaf]] = str(value)
+        self.setLldp(name)
+        self.changes += 1
+        return True
+
+    def setLldp(self, name):
+        """Set lldp fact of interface from its remaining neighbors"""
+        neighbors = self.neighbors.get(name)
+        if neighbors:
+            self.lldp[name] = neighbors[sorted(neighbors)[0]]
+        else:
+            self.neighbors.pop(name, None)
+            self.lldp.pop(name, None)
+
+    def delete(self, path):
+        """Apply delete notification (neighbor or interface removed)"""
+        elems = parsePath(path)
+        names = [elem for elem, _ in elems]
+        if names[:3] == ["lldp", "interfaces", "interface"] and elems[2][1].get("name"):
+            name = KEY_INDEX.interface(elems[2][1]["name"])
+            neighborId = elems[4][1].get("id") if len(elems) > 4 and names[4] == "neighbor" else None
+            if neighborId is None:
+                self.neighbors.pop(name, None)
+            else:
+                self.neighbors.get(name, {}).pop(neighborId, None)
+            self.setLldp(name)
+        elif names[:2] == ["interfaces", "interface"] and len(names) == 2 and elems[1][1].get("name"):
+            name = KEY_INDEX.interface(elems[1][1]["name"])
+            self.interfaces.pop(name, None)
+            self.adminDown.discard(name)
+        else:
+            return
+        self.changes += 1
+
+    def handleNotification(self, notification):
+        """Apply pygnmi subscribe notification. Returns True on sync response"""
+        if notification.get("sync_response"):
+            return True
+        update = notification.get("update", {})
+        prefix = update.get("prefix", "")
+        for item in update.get("update", []):
+            self.apply(joinPath(prefix, item["path"]), item.get("val"))
+        for path in update.get("delete", []):
+            self.delete(joinPath(prefix, path))
+        return False
+
+    def toFacts(self):
+        """Get state as Default subset facts"""
+        return {"interfaces": self.interfaces, "lldp": self.lldp}
+
+    def save(self, fname):
+        """Save state to file atomically"""
+        self.updated = time.time()
+        dirname = os.path.dirname(os.path.abspath(fname))
+        os.makedirs(dirname, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".telemetry.")
+        with os.fdopen(fd, "w", encoding="utf-8") as fobj:
+            json.dump(
+                {
+                    "version": STATE_VERSION,
+                    "updated": self.updated,
+                    "interfaces": self.interfaces,
+                    "lldp": self.lldp,
+                    "neighbors": self.neighbors,
+                    "admin_down": sorted(self.adminDown),
+                },
+                fobj,
+                separators=(",", ":"),
+            )
+        os.replace(tmpname, fname)
+
+    @classmethod
+    def load(cls, fname, maxAge=None):
+        """Load state from file. Returns None if not available or older than maxAge seconds"""
+        try:
+            with open(fname, "rb") as fd:
+                data = jsoncodec.loads(fd.read())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return None
+        if maxAge is not None and time.time() - data.get("updated", 0) > maxAge:
+            return None
+        state = cls(data.get("interfaces"), data.get("lldp"), data.get("updated", 0.0))
+        state.adminDown = set(data.get("admin_down", []))
+        if "neighbors" in data:
+            state.neighbors = data["neighbors"]
+            for name in list(state.neighbors):
+                state.setLldp(name)
+        return state
+
+
+class GnmiCollector:
+    """Subscribe to device telemetry and keep state file up to date"""
+
+    def __init__(self, target, stateFile, paths=None, flushInterval=5, clientFactory=None, **clientArgs):
+        self.target = target
+        self.stateFile = stateFile
+        self.paths = paths or TELEMETRY_PATHS
+        self.flushInterval = flushInterval
+        self.clientFactory = clientFactory
+        self.clientArgs = clientArgs
+        # Subscription sync delivers full state, so previous state file is not reused
+        self.state = TelemetryState()
+        self.stats = {"notifications": 0, "flushes": 0, "synced": False}
+
+    def getSubscription(self):
+        """Get subscribe request for pygnmi subscribe2"""
+        subscriptions = []
+        for path, mode, interval in self.paths:
+            item = {"path": path, "mode": mode}
+            if mode == "sample":
+                item["sample_interval"] = int(interval * 1e9)
+            subscriptions.append(item)
+        return {"subscription": subscriptions, "mode": "stream", "encoding": "json"}
+
+    def flush(self):
+        """Write state file"""
+        self.state.save(self.stateFile)
+        self.stats["flushes"] += 1
+
+    def run(self, duration=None, maxNotifications=None):
+        """Run subscription until duration (seconds) or maxNotifications is reached"""
+        if self.clientFactory is None:
+            self.clientFactory = getGnmiClient()
+        if self.clientFactory is None:
+            raise ImportError("pygnmi is required for telemetry collection")
+        start = lastFlush = time.time()
+        with self.clientFactory(target=self.target, **self.clientArgs) as client:
+            for notification in client.subscribe2(subscribe=self.getSubscription()):
+                self.stats["notifications"] += 1
+                synced = self.state.handleNotification(notification)
+                now = time.time()
+                if synced and not self.stats["synced"]:
+                    self.stats["synced"] = True
+                    self.flush()
+                    lastFlush = now
+                elif self.stats["synced"] and now - lastFlush >= self.flushInterval:
+                    self.flush()
+                    lastFlush = now
+                if duration is not None and now - start >= duration:
+                    break
+                if maxNotifications is not None and self.stats["notifications"] >= maxNotifications:
+                    break
+        self.flush()
+        return self.stats
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Targeted post-change verification: scoped running-config queries derived
+from applied config, so cost scales with change size and not with config size.
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/10/11
+"""
+import ipaddress
+import re
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import \
+    vlanbitmap
+from ansible_collections.sense.aristaeos.plugins.module_utils.configtree import \
+    ConfigTree
+from ansible_collections.sense.aristaeos.plugins.module_utils.keyindex import \
+    KEY_INDEX
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import \
+    run_commands
+
+# Lines which EOS stores in a different form than they are entered
+MASK_RE = re.compile(r"^((?:no )?ip address) (\d+\.\d+\.\d+\.\d+) (\d+\.\d+\.\d+\.\d+)(.*)$")
+ALLOWED_PREFIX = "switchport trunk allowed vlan "
+ALLOWED_RE = re.compile(r"^switchport trunk allowed vlan (add|remove) (\S+)$")
+
+
+def normalizeLine(line):
+    """Get line as stored in running config: single spaces, canonical interface
+    names (Et1 -> Ethernet1), ip address mask as prefix length"""
+    line = " ".join(line.split())
+    negate = "no " if line.startswith("no ") else ""
+    if line[len(negate):].startswith("interface "):
+        names = line[len(negate) + 10:].split(",")
+        return f"{negate}interface " + ",".join(KEY_INDEX.interface(name.strip()) for name in names)
+    match = MASK_RE.match(line)
+    if match:
+        try:
+            length = ipaddress.IPv4Network(f"0.0.0.0/{match.group(3)}").prefixlen
+        except ValueError:
+            return line
+        line = f"{match.group(1)} {match.group(2)}/{length}{match.group(4)}"
+    return line
+
+
+def getQuery(root, nested):
+    """Get scoped show command for top level config line"""
+    if root.startswith("no "):
+        root = root[3:]
+    if root.startswith("interface "):
+        return f"show running-config interfaces {root[10:]}"
+    if nested:
+        return f"show running-config | section {root}"
+    return f"show running-config | include {root}"
+
+
+def getExpected(path):
+    """Get (path, present) expected after apply. 'no X' expects X to be absent"""
+    if path[-1].startswith("no "):
+        return path[:-1] + [path[-1][3:]], False
+    return path, True
+
+
+def planVerify(items):
+    """Get {query: [(path, present)]} for candidate config objects"""
+    nested = {normalizeLine(item.parents[0]) for item in items if item.parents}
+    plan = {}
+    for item in items:
+        path = [normalizeLine(line) for line in item.parents + [item.text]]
+        query = getQuery(path[0], path[0] in nested)
+        plan.setdefault(query, []).append(getExpected(path))
+    return plan
+
+
+def isAllowed(tree, path):
+    """Check 'switchport trunk allowed vlan add|remove' against resulting allowed vlans"""
+    match = ALLOWED_RE.match(path[-1])
+    parents = tuple(path[:-1])
+    if tree.getObject(parents) is None:
+        return False
+    allowed = vlanbitmap.ALL_VLANS
+    # Long lists are stored as one line followed by 'add' lines
+    for key in tree.index:
+        if key[:-1] == parents and key[-1].startswith(ALLOWED_PREFIX):
+            allowed = vlanbitmap.applyAllowed(allowed, key[-1][len(ALLOWED_PREFIX):])
+    vlans = vlanbitmap.parseRanges(match.group(2))
+    return allowed & vlans == (vlans if match.group(1) == "add" else 0)
+
+
+def isPresent(tree, path, present):
+    """Check path in tree. Negated lines ('no description') match any value of the line"""
+    if present and ALLOWED_RE.match(path[-1]):
+        return isAllowed(tree, path)
+    found = tree.getObject(path) is not None
+    if found or present:
+        return found
+    prefix = path[-1] + " "
+    parents = tuple(path[:-1])
+    return any(key[:-1] == parents and key[-1].startswith(prefix) for key in tree.index)
+
+
+def verifyConfig(module, items):
+    """Run planned queries and compare only returned sections"""
+    plan = planVerify(items)
+    queries = list(plan)
+    outputs = run_commands(module, queries, check_rc=False) if queries else []
+    result = {"queries": queries, "missing": [], "unexpected": []}
+    for query, out in zip(queries, outputs):
+        tree = ConfigTree(out or "")
+        for path, present in plan[query]:
+            found = isPresent(tree, path, present)
+            if present and not found:
+                result["missing"].append(path)
+            elif not present and found:
+                result["unexpected"].append(path)
+    result["passed"] = not result["missing"] and not result["unexpected"]
+    return result
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""VLAN membership as 4096-bit bitmaps (python int, bit N - VLAN N).
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/23
+"""
+MIN_VLAN = 1
+MAX_VLAN = 4094
+
+# All usable VLANs 1-4094
+ALL_VLANS = ((1 << (MAX_VLAN + 1)) - 1) ^ 1
+
+
+def fromRange(start, end):
+    """Get bitmap of VLANs start-end (inclusive)"""
+    start, end = max(int(start), MIN_VLAN), min(int(end), MAX_VLAN)
+    if start > end:
+        return 0
+    return ((1 << (end - start + 1)) - 1) << start
+
+
+def fromList(vlans):
+    """Get bitmap of list of VLAN ids"""
+    out = 0
+    for vlan in vlans:
+        out |= fromRange(vlan, vlan)
+    return out
+
+
+def parseRanges(text):
+    """Parse range string like '10-20,30' (also 'all' and 'none') to bitmap"""
+    text = str(text).strip()
+    if text == "all":
+        return ALL_VLANS
+    if text in ["none", ""]:
+        return 0
+    out = 0
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        start, _, end = item.partition("-")
+        out |= fromRange(start, end or start)
+    return out
+
+
+def toRanges(bitmap):
+    """Get compact range string like '10-20,30' of bitmap"""
+    out = []
+    while bitmap:
+        start = (bitmap & -bitmap).bit_length() - 1
+        shifted = bitmap >> start
+        length = ((shifted + 1) & ~shifted).bit_length() - 1
+        end = start + length - 1
+        out.append(str(start) if start == end else f"{start}-{end}")
+        bitmap &= ~(((1 << length) - 1) << start)
+    return ",".join(out)
+
+
+def toList(bitmap):
+    """Get sorted list of VLAN ids of bitmap"""
+    out = []
+    while bitmap:
+        low = bitmap & -bitmap
+        out.append(low.bit_length() - 1)
+        bitmap ^= low
+    return out
+
+
+def count(bitmap):
+    """Get number of VLANs in bitmap"""
+    return bin(bitmap).count("1")
+
+
+def applyAllowed(bitmap, text):
+    """Apply 'switchport trunk allowed vlan' argument to bitmap:
+    '<ranges>', 'add <ranges>', 'remove <ranges>', 'except <ranges>', 'all', 'none'"""
+    action, _, ranges = text.strip().partition(" ")
+    if action == "add":
+        return bitmap | parseRanges(ranges)
+    if action == "remove":
+        return bitmap & ~parseRanges(ranges)
+    if action == "except":
+        return ALL_VLANS & ~parseRanges(ranges)
+    return parseRanges(text)
+
+
+def used(bitmaps):
+    """Get union of bitmaps"""
+    out = 0
+    for bitmap in bitmaps:
+        out |= bitmap
+    return out
+
+
+def free(bitmaps, pool=ALL_VLANS):
+    """Get VLANs from pool which are not used in any of bitmaps"""
+    return pool & ~used(bitmaps)
@@ -14,19 +14,19 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
+import os
+import re
 import time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.six import string_types
-from ansible.utils.display import Display
-from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import run_commands
-from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import aristaeos_argument_spec, check_args
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import ComplexList
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.parsing import Conditional
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import run_commands, to_commands
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import \
+    aristaeos_argument_spec, check_args
+from ansible_collections.sense.aristaeos.plugins.module_utils import jsoncodec
+from ansible_collections.sense.aristaeos.plugins.module_utils.payload import getFileHost, writeStream
 from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import functionwrapper
 
 
-display = Display()
-
 @functionwrapper
 def toLines(stdout):
     """stdout to list lines, split by \n character"""
@@ -35,23 +35,86 @@ def toLines(stdout):
             item = str(item).split('\n')
         yield item
 
+@functionwrapper
+def getDestName(module, idx, command):
+    """Get destination file name for command output, prefixed with host identity
+    (dest can be shared by all hosts of a play)"""
+    host = getFileHost(module, module.params['dest_host'])
+    name = re.sub(r"[^\w\-]+", "_", command['command']).strip("_")
+    ext = ".txt.gz" if module.params['dest_compress'] else ".txt"
+    return os.path.join(module.params['dest'], f"{host}_{idx}_{name}{ext}")
+
+@functionwrapper
+def streamResponses(module, commands, responses):
+    """Write responses to dest files and release them from memory"""
+    out = []
+    for idx, command in enumerate(commands):
+        fname = getDestName(module, idx, command)
+        out.append(writeStream(fname, responses[idx], module.params['dest_max_size'],
+                               module.params['dest_compress']))
+        responses[idx] = None
+    return out
+
+@functionwrapper
+def getIndexes(conditional, count):
+    """Get indexes of commands referenced by conditional (all if unknown)"""
+    match = re.match(r"^result\[(\d+)\]", conditional.key)
+    if match and int(match.group(1)) < count:
+        return {int(match.group(1))}
+    return set(range(count))
+
+@functionwrapper
+def needsJson(conditional):
+    """Check if conditional looks into json structure of response"""
+    return bool(re.match(r"^result\[\d+\]\s*[\.\[]", conditional.key))
+
+@functionwrapper
+def evaluate(conditional, responses, parsed):
+    """Evaluate conditional. Json responses are parsed once and shared via parsed dict"""
+    # netcommon parsing loads jinja2, it is imported only when wait_for is used
+    # pylint: disable=import-outside-toplevel
+    from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.parsing import \
+        FailedConditionalError
+    data = responses
+    if needsJson(conditional):
+        data = list(responses)
+        for idx in getIndexes(conditional, len(responses)):
+            if idx not in parsed:
+                try:
+                    parsed[idx] = jsoncodec.loads(responses[idx])
+                except ValueError:
+                    parsed[idx] = responses[idx]
+            data[idx] = parsed[idx]
+    try:
+        return conditional(data)
+    except FailedConditionalError:
+        return False
+
+@functionwrapper
+def getSleep(module, attempt):
+    """Get sleep time for attempt, with backoff and capped by max_interval"""
+    sleep = module.params['interval'] * (module.params['backoff'] ** attempt)
+    if module.params['max_interval'] is not None:
+        sleep = min(sleep, module.params['max_interval'])
+    return sleep
+
 @functionwrapper
 def parse_commands(module, _warnings):
     """Parse commands"""
-    command = ComplexList({'command': {'key': True}, 'prompt': {}, 'answer': {}}, module)
     if module.params.get("src", ""):
         # Load src file
         with open(module.params["src"], encoding="utf-8") as fd:
             cmds = fd.readlines()
             # if cmd starts with comment, ignore:
             cmds = [cmd for cmd in cmds if not cmd.startswith("#")]
-            commands = command(cmds)
+            commands = to_commands(module, cmds)
     elif module.params["commands"]:
-        commands = command(module.params["commands"])
+        commands = to_commands(module, module.params["commands"])
 
     for _index, item in enumerate(commands):
         if item['command'].startswith('conf'):
-            module.fail_json(msg='aristaeos_command does not support running config mode commands.  Please use aristaeos_config instead')
+            module.fail_json(msg='aristaeos_command does not support running config mode commands.  '
+                                 'Please use aristaeos_config instead')
     return commands
 
 @functionwrapper
@@ -64,7 +127,15 @@ def main():
         'wait_for': {'type': 'list', 'elements': 'str'},
         'match': {'default': 'all', 'choices': ['all', 'any']},
         'retries': {'default': 10, 'type': 'int'},
-        'interval': {'default': 1, 'type': 'int'}}
+        'interval': {'default': 1, 'type': 'float'},
+        'backoff': {'default': 1.0, 'type': 'float'},
+        'max_interval': {'type': 'float'},
+        'deadline': {'type': 'float'},
+        'dest': {'type': 'path'},
+        'dest_max_size': {'type': 'int'},
+        'dest_compress': {'default': False, 'type': 'bool'},
+        'dest_host': {'type': 'str'},
+        'stdout_lines': {'type': 'bool'}}
 
     argument_spec.update(aristaeos_argument_spec)
 
@@ -82,38 +153,62 @@ def main():
     result['warnings'] = warnings
 
     wait_for = module.params['wait_for'] or []
-    conditionals = [Conditional(c) for c in wait_for]
+    conditionals = []
+    if wait_for:
+        # netcommon parsing loads jinja2, import it only when it is needed
+        # pylint: disable=import-outside-toplevel
+        from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.parsing import \
+            Conditional
+        conditionals = [Conditional(c) for c in wait_for]
 
     retries = module.params['retries']
-    interval = module.params['interval']
     match = module.params['match']
-    responses = None
-    while retries > 0:
-        responses = run_commands(module, commands)
-
-        for item in conditionals:
-            if item(responses):
+    deadline = None
+    if module.params['deadline'] is not None:
+        deadline = time.monotonic() + module.params['deadline']
+    responses = run_commands(module, commands)
+    attempt = 0
+    while True:
+        parsed = {}
+        for item in list(conditionals):
+            if evaluate(item, responses, parsed):
                 if match == 'any':
                     conditionals = []
                     break
                 conditionals.remove(item)
 
-        if not conditionals:
-            break
-
-        time.sleep(interval)
         retries -= 1
+        if not conditionals or retries <= 0:
+            break
+        sleep = getSleep(module, attempt)
+        if deadline is not None and time.monotonic() + sleep > deadline:
+            break
+        time.sleep(sleep)
+        attempt += 1
+        # Re-run only commands which are referenced by pending conditionals
+        pending = set()
+        for item in conditionals:
+            pending |= getIndexes(item, len(commands))
+        pending = sorted(pending)
+        for idx, out in zip(pending, run_commands(module, [commands[idx] for idx in pending])):
+            responses[idx] = out
 
     if conditionals:
         failed_conditions = [item.raw for item in conditionals]
         msg = 'One or more conditional statements have not been satisfied'
         module.fail_json(msg=msg, failed_conditions=failed_conditions)
 
-    result.update({
-        'changed': False,
-        'stdout': responses,
-        'stdout_lines': list(toLines(responses))
-    })
+    stdoutLines = module.params['stdout_lines']
+    if module.params['dest']:
+        # Output is only on controller side files, lines only if explicitly asked
+        if stdoutLines:
+            result['stdout_lines'] = list(toLines(responses))
+        result['stdout'] = streamResponses(module, commands, responses)
+    else:
+        result['stdout'] = responses
+        if stdoutLines is None or stdoutLines:
+            result['stdout_lines'] = list(toLines(responses))
+    result['changed'] = False
 
     module.exit_json(**result)
 
@@ -24,15 +24,17 @@ DOCUMENTATION = ""
 EXAMPLES = ""
 RETURN = ""
 from ansible.module_utils.basic import AnsibleModule
-from ansible.utils.display import Display
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
     NetworkConfig, dumps)
+from ansible_collections.sense.aristaeos.plugins.module_utils.checkpoint import (
+    checkpoint_spec, getCheckpointName, listCheckpoints, pruneCheckpoints,
+    restoreCheckpoint, saveCheckpoint)
 from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import (
     aristaeos_argument_spec, check_args, get_config, load_config)
 from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import \
     functionwrapper
-
-display = Display()
+from ansible_collections.sense.aristaeos.plugins.module_utils.verify import \
+    verifyConfig
 
 
 @functionwrapper
@@ -41,6 +43,9 @@ def get_candidate(module):
     candidate = NetworkConfig(indent=1)
     if module.params["src"]:
         candidate.load(module.params["src"])
+    elif module.params["lines"]:
+        lines = [line["command"] if isinstance(line, dict) else line for line in module.params["lines"]]
+        candidate.add(lines, parents=module.params["parents"] or [])
     return candidate
 
 
@@ -53,6 +58,32 @@ def get_running_config(module):
     return contents
 
 
+@functionwrapper
+def rollback(module, result):
+    """Restore checkpoint ('last' - newest checkpoint with prefix)"""
+    name = module.params["rollback"]
+    if name == "last":
+        prefix = (module.params["checkpoint"] or {}).get("prefix", checkpoint_spec["prefix"]["default"])
+        names = listCheckpoints(module, prefix)
+        if not names:
+            module.fail_json(msg=f"no checkpoints with prefix {prefix} to rollback to")
+        name = names[-1]
+    if not module.check_mode:
+        restoreCheckpoint(module, name)
+    result["changed"] = True
+    result["rollback"] = name
+    module.exit_json(**result)
+
+
+@functionwrapper
+def checkpoint(module, result):
+    """Save checkpoint before change and prune old checkpoints"""
+    opts = module.params["checkpoint"]
+    name = saveCheckpoint(module, opts["name"] or getCheckpointName(opts["prefix"]))
+    result["checkpoint"] = name
+    result["deleted_checkpoints"] = pruneCheckpoints(module, opts["prefix"], opts["retention"], keep=name)
+
+
 @functionwrapper
 def main():
     """Main function for the Ansible module."""
@@ -69,11 +100,14 @@ def main():
         "save": {"type": "bool", "default": False},
         "config": {},
         "backup": {"type": "bool", "default": False},
-        "backup_options": {"type": "dict", "options": backup_spec}}
+        "backup_options": {"type": "dict", "options": backup_spec},
+        "checkpoint": {"type": "dict", "options": checkpoint_spec},
+        "rollback": {"type": "str"},
+        "verify": {"default": "none", "choices": ["none", "report", "fail"]}}
 
     argument_spec.update(aristaeos_argument_spec)
 
-    mutually_exclusive = [("lines", "src"), ("parents", "src")]
+    mutually_exclusive = [("lines", "src"), ("parents", "src"), ("rollback", "lines"), ("rollback", "src")]
     module = AnsibleModule(
         argument_spec=argument_spec,
         mutually_exclusive=mutually_exclusive,
@@ -84,6 +118,9 @@ def main():
 
     result = {"changed": False, "saved": False, "warnings": warnings}
 
+    if module.params["rollback"]:
+        rollback(module, result)
+
     candidate = get_candidate(module)
 
     commands = []
@@ -105,13 +142,19 @@ def main():
             commands = commands.split("\n")
 
         if not module.check_mode and module.params["update"] == "merge":
+            if module.params["checkpoint"]:
+                checkpoint(module, result)
             config_block = "\n".join(commands)
             load_config(module, config_block)
+            if module.params["verify"] != "none":
+                result["verify"] = verifyConfig(module, candidate.items)
 
         result["changed"] = True
         result["commands"] = commands
         result["updates"] = commands
 
+    if result.get("verify") and not result["verify"]["passed"] and module.params["verify"] == "fail":
+        module.fail_json(msg="Applied config is not in running config", **result)
     module.exit_json(**result)
 
 
@@ -10,28 +10,45 @@ Email                   : juztas (at) gmail.com
 @Copyright              : General Public License v3.0+
 Date                    : 2023/11/05
 """
+import hashlib
+import itertools
 import json
+import os
+import tempfile
 # Copyright: Contributors to the Ansible project
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 import traceback
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.six import iteritems
-from ansible.utils.display import Display
+from ansible_collections.sense.aristaeos.plugins.module_utils import (
+    collstats, jsoncodec, vlanbitmap)
+from ansible_collections.sense.aristaeos.plugins.module_utils.keyindex import \
+    KEY_INDEX
+from ansible_collections.sense.aristaeos.plugins.module_utils.telemetry import \
+    TelemetryState
 from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import (
-    aristaeos_argument_spec, check_args, run_commands)
+    aristaeos_argument_spec, check_args, get_config, run_commands)
+from ansible_collections.sense.aristaeos.plugins.module_utils.payload import (
+    getFileHost, large_facts_spec, packFacts)
+from ansible_collections.sense.aristaeos.plugins.module_utils.records import (
+    Route, intern, routesToColumns, routesToDicts, routeToDict)
+from ansible_collections.sense.aristaeos.plugins.module_utils.refresh import (
+    RefreshStore, refresh_spec)
 from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import (
-    classwrapper, functionwrapper)
+    classwrapper, functionwrapper, getDisplay)
 
-display = Display()
+display = getDisplay()
+
+SNAPSHOT_VERSION = 1
 
 
 @functionwrapper
-def loadJson(indata, raiseExc=False):
-    """Load json data"""
+def loadJson(indata, raiseExc=False, name="unknown"):
+    """Load json data (str or bytes), decode stats are recorded under name"""
     data = {}
     try:
-        data = json.loads(indata)
+        data = jsoncodec.decode(name, indata)
     except Exception as ex:
         display.vvv(traceback.format_exc())
         if raiseExc:
@@ -39,88 +56,320 @@ def loadJson(indata, raiseExc=False):
     return data
 
 
+@functionwrapper
+def loadSnapshot(fname):
+    """Load routing snapshot from file. Returns None if it is not available"""
+    try:
+        with open(fname, "rb") as fd:
+            data = jsoncodec.loads(fd.read())
+    except (OSError, ValueError):
+        display.vvv(traceback.format_exc())
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    return data.get("routes", {})
+
+
+@functionwrapper
+def saveSnapshot(fname, routes):
+    """Save routing snapshot to file atomically"""
+    dirname = os.path.dirname(os.path.abspath(fname))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=dirname, prefix=".snapshot.")
+    with os.fdopen(fd, "w", encoding="utf-8") as fobj:
+        json.dump({"version": SNAPSHOT_VERSION, "routes": routes}, fobj, separators=(",", ":"))
+    os.replace(tmpname, fname)
+
+
 @classwrapper
 class FactsBase:
     """Base class for Facts"""
 
     COMMANDS = []
+    # Freshness interval (seconds) of subset commands and per command overrides
+    INTERVAL = 0
+    INTERVALS = {}
 
     def __init__(self, module):
         self.module = module
         self.facts = {}
-        self.responses = None
+        self.commands = list(self.COMMANDS)
+        self.store = None
+
+    def getInterval(self, cmd):
+        """Get declared freshness interval of command"""
+        return self.INTERVALS.get(cmd, self.INTERVAL)
+
+    def getName(self):
+        """Get subset name"""
+        return self.__class__.__name__.lower()
+
+    def isStale(self, cmd):
+        """Check if command has to be fetched (always, if refresh store is not used)"""
+        return self.store is None or self.store.isStale(self.getName(), cmd, self.getInterval(cmd))
 
     def populate(self):
-        """Populate responses"""
-        self.responses = run_commands(self.module, self.COMMANDS, check_rc=False)
+        """Fetch stale commands, parse them to fragments and build facts of fetched
+        and stored (fresh) fragments"""
+        subset = self.getName()
+        fetch = [cmd for cmd in self.commands if self.isStale(cmd)]
+        fragments = {}
+        if fetch:
+            responses = run_commands(self.module, fetch, check_rc=False, raw=True)
+            for idx, cmd in enumerate(fetch):
+                fragments[cmd] = self.parseCommand(cmd, loadJson(responses[idx], False, cmd))
+                # Raw response is not needed after it is parsed
+                responses[idx] = None
+                if self.store is not None:
+                    self.store.update(subset, cmd, self.getInterval(cmd), fragments[cmd])
+        for cmd in self.commands:
+            if cmd not in fragments:
+                fragments[cmd] = self.loadFragment(cmd, self.store.getFragment(subset, cmd))
+            if self.store is not None:
+                self.store.record(subset, cmd, cmd in fetch)
+        self.build(fragments)
+
+    def parseCommand(self, cmd, data):
+        """Get fragment of command json response (stored in refresh store)"""
+        return data
+
+    def loadFragment(self, cmd, data):
+        """Get fragment of command from its stored (json) form"""
+        return data
+
+    def build(self, fragments):
+        """Build facts of command fragments {command: fragment}"""
 
     def run(self, cmd):
         """Run commands"""
         return run_commands(self.module, cmd, check_rc=False)
 
 
+# Interface fact field -> key used in `show interfaces | json` output
+INTERFACE_FIELDS = {
+    "bandwidth": "bandwidth",
+    "duplex": "duplex",
+    "lineprotocol": "lineProtocolStatus",
+    "macaddress": "physicalAddress",
+    "description": "description",
+    "mtu": "mtu",
+    "operstatus": "interfaceStatus",
+    "channel-member": "memberInterfaces",
+}
+
+# Commands able to provide interface fields. `keys` translates the command
+# output keys to the `show interfaces | json` keys (None - same keys), so the
+# same getters are used for every source. Cost is relative payload size.
+# `types` are interface name prefixes listed by the command (None - all
+# interfaces, e.g. status does not list Vlan, Loopback and Vxlan interfaces).
+INTERFACE_SOURCES = {
+    "show interfaces description | json": {
+        "cost": 1,
+        "root": "interfaceDescriptions",
+        "types": None,
+        "keys": {"description": "description", "lineProtocolStatus": "lineProtocolStatus"},
+    },
+    "show interfaces status | json": {
+        "cost": 3,
+        "root": "interfaceStatuses",
+        "types": ["Ethernet", "Port-Channel", "Management"],
+        "keys": {
+            "description": "description",
+            "lineProtocolStatus": "lineProtocolStatus",
+            "linkStatus": "interfaceStatus",
+            "bandwidth": "bandwidth",
+            "duplex": "duplex",
+        },
+    },
+    "show interfaces | json": {"cost": 10, "root": "interfaces", "types": None, "keys": None},
+}
+
+# Interface fact fields which are parsed from switchport command (not from running config,
+# so default run does not fetch the running config)
+SWITCHPORT_FIELDS = ["switchport"]
+SWITCHPORT_COMMAND = "show interfaces switchport | json"
+
+# Interface fact fields (and lldp) which are served from telemetry state, if it is fresh
+TELEMETRY_FIELDS = ["operstatus", "lineprotocol"]
+
+
+@functionwrapper
+def sourceFields(cmd):
+    """Get interface fields which command is able to provide"""
+    keys = INTERFACE_SOURCES[cmd]["keys"]
+    if keys is None:
+        return set(INTERFACE_FIELDS)
+    return {field for field, key in INTERFACE_FIELDS.items() if key in keys.values()}
+
+
+@functionwrapper
+def planInterfaceCommands(fields):
+    """Get cheapest list of commands which covers all requested interface fields
+    and lists all interfaces (at least one command without `types` limit)"""
+    fields = set(fields)
+    best, bestCost = None, None
+    cmds = sorted(INTERFACE_SOURCES, key=lambda cmd: INTERFACE_SOURCES[cmd]["cost"])
+    for size in range(1, len(cmds) + 1):
+        for combo in itertools.combinations(cmds, size):
+            covered = set()
+            for cmd in combo:
+                covered |= sourceFields(cmd)
+            if not fields.issubset(covered):
+                continue
+            if all(INTERFACE_SOURCES[cmd]["types"] is not None for cmd in combo):
+                continue
+            cost = sum(INTERFACE_SOURCES[cmd]["cost"] for cmd in combo)
+            if bestCost is None or cost < bestCost:
+                best, bestCost = list(combo), cost
+    return best or []
+
+
 @classwrapper
 class Default(FactsBase):
     """Default Class to get basic info"""
 
     COMMANDS = [
         "show version | json",
-        "show running-config",
         "show interfaces | json",
         "show lldp neighbors detail | json",
         "show vlan | json",
     ]
 
-    def populate(self):
-        super(Default, self).populate()
+    INTERVAL = 60
+    INTERVALS = {
+        "show version | json": 3600,
+        "show interfaces status | json": 30,
+        "show interfaces description | json": 300,
+        "show lldp neighbors detail | json": 300,
+        "show vlan | json": 300,
+        SWITCHPORT_COMMAND: 300,
+    }
+
+    def __init__(self, module):
+        super(Default, self).__init__(module)
+        self.fields = set(module.params.get("interface_fields") or list(INTERFACE_FIELDS) + SWITCHPORT_FIELDS)
+        self.telemetry = None
+        if module.params.get("telemetry"):
+            self.telemetry = TelemetryState.load(
+                module.params["telemetry"]["state_file"], module.params["telemetry"]["max_age"]
+            )
+        pollFields = self.fields.intersection(INTERFACE_FIELDS)
+        if self.telemetry:
+            pollFields.difference_update(TELEMETRY_FIELDS)
+        self.intfCommands = planInterfaceCommands(pollFields)
+        self.commands = [cmd for cmd in self.COMMANDS if cmd not in INTERFACE_SOURCES]
+        if self.telemetry:
+            self.commands.remove("show lldp neighbors detail | json")
+        self.commands[1:1] = self.intfCommands
+        if self.fields.intersection(SWITCHPORT_FIELDS):
+            self.commands.append(SWITCHPORT_COMMAND)
+
+    def parseCommand(self, cmd, data):
+        """Get fragment of command response. Interface names are kept as reported,
+        they are canonicalized when facts are built"""
+        if cmd == "show version | json":
+            return {"macs": [data["systemMacAddress"]] if data.get("systemMacAddress") else []}
+        if cmd in INTERFACE_SOURCES:
+            return self.parseInterfaces(cmd, data)
+        if cmd == SWITCHPORT_COMMAND:
+            return self.parse_switchport(data)
+        if cmd == "show lldp neighbors detail | json":
+            out = {}
+            for lldpIntf, lldpdata in data.get("lldpNeighbors", {}).items():
+                lldpparsed = self.getlldpIntfDict(lldpdata.get("lldpNeighborInfo", []))
+                if lldpparsed:
+                    out[lldpIntf] = lldpparsed
+            return out
+        if cmd == "show vlan | json":
+            return {key: list(vals.get("interfaces", {})) for key, vals in data.get("vlans", {}).items()}
+        return data
+
+    def parseInterfaces(self, cmd, data):
+        """Get {interface: {field: value}} of all fields which interface source provides"""
+        source = INTERFACE_SOURCES[cmd]
+        actions = {
+            "bandwidth": self.getBW,
+            "duplex": self.getDuplex,
+            "lineprotocol": self.getLineProtocol,
+            "macaddress": self.getMacAddress,
+            "description": self.getDescription,
+            "mtu": self.getMTU,
+            "operstatus": self.getOperStatus,
+            "channel-member": self.getChannelMember,
+        }
+        fields = sourceFields(cmd)
+        out = {}
+        for key, vals in data.get(source["root"], {}).items():
+            if source["keys"] is not None:
+                vals = {source["keys"][k]: v for k, v in vals.items() if k in source["keys"]}
+            out[key] = {}
+            for key1 in fields:
+                val = actions[key1](vals)
+                if val:
+                    out[key][key1] = val
+        return out
+
+    def build(self, fragments):
         # 0 command, get mac of system
-        data = loadJson(self.responses[0])
-        self.facts.setdefault("info", {"macs": []})
-        if data.get("systemMacAddress"):
-            self.facts["info"]["macs"].append(data["systemMacAddress"])
-        # 1 command, get running config
-        data = self.responses[1]
-        self.facts["config"] = data
-        # 2 command, get interfaces
-        data = loadJson(self.responses[2])
-        self.facts.setdefault("interfaces", {})
-        for key, vals in data.get("interfaces", {}).items():
-            self.facts["interfaces"].setdefault(key, {})
-            actions = {
-                "bandwidth": self.getBW,
-                "duplex": self.getDuplex,
-                "lineprotocol": self.getLineProtocol,
-                "macaddress": self.getMacAddress,
-                "description": self.getDescription,
-                "mtu": self.getMTU,
-                "operstatus": self.getOperStatus,
-                "channel-member": self.getChannelMember,
-            }
-            for key1, action in actions.items():
-                out = action(vals)
-                if out:
-                    self.facts["interfaces"][key][key1] = out
-        # 3 - get switchport information
-        self.parse_switchport(self.facts["config"])
-        # 4 - get lldp information
-        data = loadJson(self.responses[3])
-        self.facts["lldp"] = {}
-        for lldpIntf, lldpdata in data.get("lldpNeighbors", {}).items():
-            lldpparsed = self.getlldpIntfDict(lldpdata.get("lldpNeighborInfo", []))
-            if lldpparsed:
-                lldpparsed["local_port_id"] = lldpIntf
-                self.facts["lldp"][lldpIntf] = lldpparsed
-
-        # 5 - get vlan tagged interfaces;
-        data = loadJson(self.responses[4])
-        for key, vals in data.get("vlans", {}).items():
+        self.facts["info"] = {"macs": list(fragments["show version | json"]["macs"])}
+        # 1 command, get interfaces (from cheapest commands which cover requested fields)
+        self.facts["interfaces"] = {}
+        for cmd in self.intfCommands:
+            wanted = sourceFields(cmd) & self.fields
+            if self.telemetry:
+                wanted.difference_update(TELEMETRY_FIELDS)
+            KEY_INDEX.register(fragments[cmd])
+            for key, vals in fragments[cmd].items():
+                self.facts["interfaces"].setdefault(key, {})
+                for key1 in wanted:
+                    if key1 in vals:
+                        # Status values repeat on every interface, keep one copy of each
+                        self.facts["interfaces"][key][key1] = intern(vals[key1])
+                mac = vals.get("macaddress") if "macaddress" in wanted else None
+                if mac and mac not in self.facts["info"]["macs"]:
+                    self.facts["info"]["macs"].append(mac)
+        # 2 - get switchport mode and allowed vlans
+        if self.fields.intersection(SWITCHPORT_FIELDS):
+            for intf, vals in fragments[SWITCHPORT_COMMAND].items():
+                self.facts["interfaces"].setdefault(KEY_INDEX.interface(intf), {}).update(vals)
+        # 3 - get lldp information (and interface state from telemetry, if it is fresh)
+        if self.telemetry:
+            self.populateTelemetry()
+        else:
+            self.facts["lldp"] = {}
+            for lldpIntf, lldpparsed in fragments["show lldp neighbors detail | json"].items():
+                lldpIntf = KEY_INDEX.interface(lldpIntf)
+                self.facts["lldp"][lldpIntf] = dict(lldpparsed, local_port_id=lldpIntf)
+
+        # 4 - get vlan tagged interfaces and per interface vlan membership;
+        vlanBitmaps = {}
+        for key, intfs in fragments["show vlan | json"].items():
             vlanName = f"Vlan{key}"
-            if vlanName in self.facts["interfaces"]:
-                for intf in vals.get("interfaces", {}).keys():
-                    if intf not in self.facts["interfaces"]:
-                        continue
+            vlanBit = vlanbitmap.fromRange(key, key)
+            for intf in intfs:
+                intf = KEY_INDEX.interface(intf)
+                if intf not in self.facts["interfaces"]:
+                    continue
+                vlanBitmaps[intf] = vlanBitmaps.get(intf, 0) | vlanBit
+                if vlanName in self.facts["interfaces"]:
                     self.facts["interfaces"][vlanName].setdefault("tagged", [])
                     self.facts["interfaces"][vlanName]["tagged"].append(intf)
+        for intf, bitmap in vlanBitmaps.items():
+            self.facts["interfaces"][intf]["vlans"] = vlanbitmap.toRanges(bitmap)
+
+    def populateTelemetry(self):
+        """Merge interface state and lldp neighbors from telemetry state"""
+        state = self.telemetry.toFacts()
+        for intf, vals in state["interfaces"].items():
+            if intf not in self.facts["interfaces"]:
+                continue
+            for key in self.fields.intersection(TELEMETRY_FIELDS):
+                if key in vals:
+                    self.facts["interfaces"][intf][key] = vals[key]
+            if "counters" in vals:
+                self.facts["interfaces"][intf]["counters"] = vals["counters"]
+        self.facts["lldp"] = state["lldp"]
+        self.facts["telemetry"] = {"updated": self.telemetry.updated}
 
     @staticmethod
     def getlldpIntfDict(lldpneiginfo):
@@ -143,16 +392,11 @@ class Default(FactsBase):
                 "macAddress"
             ]:
                 if item["neighborInterfaceInfo"].get("interfaceId", ""):
-                    tmpmac = item["neighborInterfaceInfo"].get("interfaceId", "").replace(".", "")
-                    splitMac = [tmpmac[index : index + 2] for index in range(0, len(tmpmac), 2)]
-                    out["remote_port_id"] = ":".join(splitMac)
+                    out["remote_port_id"] = KEY_INDEX.mac(item["neighborInterfaceInfo"]["interfaceId"])
             if item.get("systemName", ""):
-                out["remote_system_name"] = item["systemName"]
+                out["remote_system_name"] = intern(item["systemName"])
             if item.get("chassisId", ""):
-                mac = item["chassisId"].replace(".", "")
-                split_mac = [mac[index : index + 2] for index in range(0, len(mac), 2)]
-                mac = ":".join(split_mac)
-                out["remote_chassis_id"] = mac
+                out["remote_chassis_id"] = KEY_INDEX.mac(item["chassisId"])
         return out
 
     # bandwidth -> bandwidth
@@ -182,8 +426,6 @@ class Default(FactsBase):
         """Get mac address"""
         for key in ["physicalAddress", "burnedInAddress"]:
             if key in data:
-                if data[key] not in self.facts["info"]["macs"]:
-                    self.facts["info"]["macs"].append(data[key])
                 return data[key]
         return None
 
@@ -212,24 +454,25 @@ class Default(FactsBase):
         """Get channel member"""
         out = []
         if "memberInterfaces" in data:
-            out = data["memberInterfaces"].keys()
+            out = list(data["memberInterfaces"].keys())
         return out
 
-    def parse_switchport(self, data):
-        """Parse switchport information"""
-        interfaceSt = False
-        intfKey = None
-        for line in data.split("\n"):
-            line = line.strip()  # Remove all white spaces
-            display.v(f"{intfKey} {line}")
-            if line == "!" and interfaceSt:
-                interfaceSt = False  # This means interface ended!
-            elif line.startswith("interface"):
-                interfaceSt = True
-                intfKey = line[10:]
-            elif interfaceSt and line == "switchport mode trunk":
-                self.facts["interfaces"].setdefault(intfKey, {})
-                self.facts["interfaces"][intfKey]["switchport"] = "yes"
+    @staticmethod
+    def parse_switchport(data):
+        """Parse switchport mode and allowed vlans (trunk allowed or access vlan)"""
+        out = {}
+        for intf, vals in data.get("switchports", {}).items():
+            info = vals.get("switchportInfo", {})
+            if info.get("mode") == "trunk":
+                out[intf] = {"switchport": "yes"}
+                bitmap = vlanbitmap.parseRanges(str(info.get("trunkAllowedVlans", "all")).lower())
+            elif info.get("mode") == "access" and info.get("accessVlanId"):
+                out[intf] = {}
+                bitmap = vlanbitmap.fromRange(info["accessVlanId"], info["accessVlanId"])
+            else:
+                continue
+            out[intf]["allowed_vlans"] = vlanbitmap.toRanges(bitmap)
+        return out
 
 
 @classwrapper
@@ -238,32 +481,269 @@ class Routing(FactsBase):
 
     COMMANDS = ["show ip route vrf all | json", "show ipv6 route vrf all | json"]
 
-    def populate(self):
-        """Populate responses"""
-        super(Routing, self).populate()
-        data = loadJson(self.responses[1], False)
-        self.facts["ipv4"] = self.getRoutes(data)
-        data = loadJson(self.responses[1], False)
-        self.facts["ipv6"] = self.getRoutes(data)
+    FAMILIES = {"ipv4": "show ip route vrf all | json", "ipv6": "show ipv6 route vrf all | json"}
+
+    INTERVAL = 120
+
+    def parseCommand(self, cmd, data):
+        """Get route records of route command"""
+        return self.getRoutes(data)
+
+    def loadFragment(self, cmd, data):
+        """Get route records of stored routes"""
+        return [Route(*route) for route in data]
+
+    def build(self, fragments):
+        """Build route facts (or delta of routes since previous run)"""
+        routes = {}
+        for family, cmd in self.FAMILIES.items():
+            # Records are converted in place when facts are emitted, stored fragment keeps records
+            routes[family] = fragments[cmd] if self.store is None else list(fragments[cmd])
+        deltaOpts = self.module.params.get("routing_delta")
+        if not deltaOpts:
+            self.facts.update(self.getOutput(routes))
+            return
+        # Delta mode - compare with previous snapshot of this device and report only changes
+        snapshot = {family: self.getSnapshot(vals) for family, vals in routes.items()}
+        previous = None if deltaOpts["resync"] else loadSnapshot(deltaOpts["snapshot"])
+        if previous is None:
+            self.facts.update(self.getOutput(routes))
+            self.facts["routing_delta"] = {"resync": True}
+        else:
+            self.facts["routing_delta"] = {"resync": False}
+            for family, vals in snapshot.items():
+                self.facts["routing_delta"][family] = self.getDelta(previous.get(family, {}), vals)
+        saveSnapshot(deltaOpts["snapshot"], snapshot)
+
+    def getOutput(self, routes):
+        """Get route facts of route records (list of dicts, or columns)"""
+        if self.module.params.get("routing_format") == "columnar":
+            return {family: routesToColumns(vals) for family, vals in routes.items()}
+        return {family: routesToDicts(vals) for family, vals in routes.items()}
+
+    @staticmethod
+    def getSnapshot(routes):
+        """Get routes keyed by vrf and prefix"""
+        out = {}
+        for route in routes:
+            out.setdefault(route.vrf, {})[route.prefix] = [route.intf, route.to]
+        return out
+
+    @staticmethod
+    def getDelta(old, new):
+        """Get added, removed and changed routes between two snapshots"""
+        out = {"added": [], "removed": [], "changed": []}
+
+        def toRoute(vrf, prefix, val):
+            return routeToDict(Route(vrf, prefix, KEY_INDEX.interface(val[0]) if val[0] else None, val[1]))
+
+        for vrf, routes in new.items():
+            oldroutes = old.get(vrf, {})
+            for prefix, val in routes.items():
+                if prefix not in oldroutes:
+                    out["added"].append(toRoute(vrf, prefix, val))
+                elif oldroutes[prefix] != val:
+                    out["changed"].append(toRoute(vrf, prefix, val))
+        for vrf, routes in old.items():
+            newroutes = new.get(vrf, {})
+            for prefix, val in routes.items():
+                if prefix not in newroutes:
+                    out["removed"].append(toRoute(vrf, prefix, val))
+        return out
 
     def getRoutes(self, data):
-        """Get routes"""
+        """Get route records (vrf, interface and next hop strings are interned)"""
         out = []
         for vrf, routes in data.get("vrfs", {}).items():
+            vrf = intern(vrf)
             for rfrom, rdict in routes.get("routes", {}).items():
-                route = {"vrf": vrf, "from": rfrom}
-                if "vias" in rdict and len(rdict.get("vias", [])) > 0:
-                    if "interface" in rdict["vias"][0]:
-                        intf = rdict["vias"][0]["interface"]
-                        route["intf"] = intf
-                    if "nexthopAddr" in rdict["vias"][0]:
-                        rto = rdict["vias"][0]["nexthopAddr"]
-                        route["to"] = rto
-                out.append(route)
+                intf, rto = None, None
+                if rdict.get("vias"):
+                    via = rdict["vias"][0]
+                    if "interface" in via:
+                        intf = KEY_INDEX.interface(via["interface"])
+                    if "nexthopAddr" in via:
+                        rto = intern(via["nexthopAddr"])
+                out.append(Route(vrf, rfrom, intf, rto))
         return out
 
 
-FACT_SUBSETS = {"default": Default, "routing": Routing}
+@classwrapper
+class Config(FactsBase):
+    """Running Config Information Class"""
+
+    def populate(self):
+        """Populate running config hash and summary"""
+        data = get_config(self.module)
+        self.facts["config"] = self.getSummary(data)
+        if self.module.params["config_text"]:
+            self.facts["config"]["text"] = data
+
+    @staticmethod
+    def getSummary(data):
+        """Get summary of running config"""
+        out = {
+            "sha256": hashlib.sha256(data.encode("utf-8")).hexdigest(),
+            "size": len(data),
+            "lines": 0,
+            "interfaces": 0,
+            "vrfs": 0,
+        }
+        for line in data.split("\n"):
+            if not line.strip() or line.startswith("!"):
+                continue
+            out["lines"] += 1
+            if line.startswith("hostname "):
+                out["hostname"] = line[9:].strip()
+            elif line.startswith("interface "):
+                out["interfaces"] += 1
+            elif line.startswith("vrf instance "):
+                out["vrfs"] += 1
+        return out
+
+
+@classwrapper
+class Neighbors(FactsBase):
+    """ARP and IPv6 neighbor tables, indexed by ip, mac and interface"""
+
+    COMMANDS = ["show ip arp vrf all | json", "show ipv6 neighbors vrf all | json"]
+
+    FIELDS = ["vrf", "ip", "mac", "interface", "port"]
+
+    INTERVAL = 60
+
+    def __init__(self, module):
+        super(Neighbors, self).__init__(module)
+        # VRF filter is pushed down to the device, one command per vrf and family
+        self.vrfs = module.params.get("neighbors_vrfs") or ["all"]
+        self.families = []
+        for vrf in self.vrfs:
+            self.families.append((vrf, "ipV4Neighbors", f"show ip arp vrf {vrf} | json"))
+            self.families.append((vrf, "ipV6Neighbors", f"show ipv6 neighbors vrf {vrf} | json"))
+        self.commands = [cmd for _, _, cmd in self.families]
+
+    def parseCommand(self, cmd, data):
+        """Get neighbor entries of arp or ipv6 neighbors command"""
+        entries = []
+        for vrf, key, fcmd in self.families:
+            if fcmd != cmd:
+                continue
+            # vrf all output is keyed by vrf, single vrf output is not
+            vrfs = data.get("vrfs", {vrf: data}) if vrf == "all" else {vrf: data}
+            for vrfName, vals in vrfs.items():
+                for item in vals.get(key, []):
+                    entries.append(self.getEntry(vrfName, item))
+        return entries
+
+    def build(self, fragments):
+        """Build neighbor entries and indexes"""
+        entries = []
+        for cmd in self.commands:
+            entries.extend(fragments[cmd])
+        out = {"fields": self.FIELDS, "entries": entries, "by_ip": {}, "by_mac": {}, "by_interface": {}}
+        for idx, entry in enumerate(entries):
+            out["by_ip"].setdefault(entry[1], []).append(idx)
+            out["by_mac"].setdefault(entry[2], []).append(idx)
+            for intf in {entry[3], entry[4]}:
+                if intf:
+                    out["by_interface"].setdefault(intf, []).append(idx)
+        self.facts["neighbors"] = out
+
+    @staticmethod
+    def getEntry(vrf, item):
+        """Get compact [vrf, ip, mac, interface, port] entry.
+        Interface of SVI entries is reported as 'Vlan10, Ethernet1' (port where mac is learned)"""
+        intf, _, port = item.get("interface", "").partition(",")
+        intf, port = intf.strip(), port.strip()
+        intf = KEY_INDEX.interface(intf)
+        port = KEY_INDEX.interface(port) if port else intf
+        return [vrf, item.get("address", ""), KEY_INDEX.mac(item.get("hwAddress", "")), intf, port]
+
+
+@classwrapper
+class Lag(FactsBase):
+    """Port-channel and MLAG information, with member to port-channel index"""
+
+    COMMANDS = [
+        "show interfaces status | json",
+        "show port-channel | json",
+        "show mlag | json",
+        "show mlag interfaces | json",
+    ]
+
+    INTERVAL = 120
+
+    MLAG_KEYS = {
+        "state": "state",
+        "negStatus": "neg_status",
+        "domainId": "domain_id",
+        "localInterface": "local_interface",
+        "peerAddress": "peer_address",
+        "peerLink": "peer_link",
+        "peerLinkStatus": "peer_link_status",
+        "systemId": "system_id",
+    }
+
+    def parseCommand(self, cmd, data):
+        """Get fragment of command response"""
+        if cmd == "show interfaces status | json":
+            return {
+                intf: {"linkStatus": vals.get("linkStatus", "unknown"), "bandwidth": vals.get("bandwidth", 0)}
+                for intf, vals in data.get("interfaceStatuses", {}).items()
+            }
+        if cmd == "show port-channel | json":
+            return {
+                lagName: {key: list(vals.get(key, {})) for key in ("activePorts", "inactivePorts")}
+                for lagName, vals in data.get("portChannels", {}).items()
+            }
+        if cmd == "show mlag | json":
+            return {key: data[ekey] for ekey, key in self.MLAG_KEYS.items() if ekey in data}
+        if cmd == "show mlag interfaces | json":
+            keys = ("localInterface", "status", "peerInterfaceStatus")
+            return {
+                mlagId: {key: vals[key] for key in keys if key in vals}
+                for mlagId, vals in data.get("interfaces", {}).items()
+            }
+        return data
+
+    def build(self, fragments):
+        """Build port-channels, members index and mlag state"""
+        statuses = fragments["show interfaces status | json"]
+        lags = {}
+        members = {}
+        for lagName, vals in fragments["show port-channel | json"].items():
+            status = statuses.get(lagName, {})
+            lag = {
+                "members": [],
+                "active": [],
+                "status": status.get("linkStatus", "unknown"),
+                "bandwidth": 0,
+                "active_bandwidth": 0,
+            }
+            for key, active in (("activePorts", True), ("inactivePorts", False)):
+                for member in vals.get(key, []):
+                    member = KEY_INDEX.interface(member)
+                    bandwidth = statuses.get(member, {}).get("bandwidth", 0) // 1000000
+                    lag["members"].append(member)
+                    lag["bandwidth"] += bandwidth
+                    if active:
+                        lag["active"].append(member)
+                        lag["active_bandwidth"] += bandwidth
+                    members[member] = lagName
+            lags[lagName] = lag
+        self.facts["mlag"] = dict(fragments["show mlag | json"])
+        for mlagId, vals in fragments["show mlag interfaces | json"].items():
+            lag = lags.get(vals.get("localInterface"))
+            if lag is None:
+                continue
+            lag["mlag_id"] = int(mlagId)
+            lag["mlag_status"] = vals.get("status", "unknown")
+            lag["mlag_peer_status"] = vals.get("peerInterfaceStatus", "unknown")
+        self.facts["lags"] = lags
+        self.facts["lag_members"] = members
+
+
+FACT_SUBSETS = {"default": Default, "routing": Routing, "config": Config, "neighbors": Neighbors, "lag": Lag}
 
 VALID_SUBSETS = frozenset(FACT_SUBSETS.keys())
 
@@ -271,9 +751,38 @@ VALID_SUBSETS = frozenset(FACT_SUBSETS.keys())
 @functionwrapper
 def main():
     """main entry point for module execution"""
-    argument_spec = {"gather_subset": {"default": ["!config"], "type": "list"}}
+    argument_spec = {
+        "gather_subset": {"default": ["!config", "!neighbors", "!lag"], "type": "list"},
+        "interface_fields": {"type": "list", "elements": "str", "choices": list(INTERFACE_FIELDS) + SWITCHPORT_FIELDS},
+        "config_text": {"default": False, "type": "bool"},
+        "large_facts": {"type": "dict", "options": large_facts_spec},
+        "stats_textfile": {"type": "path"},
+        "stats_device": {"default": "unknown", "type": "str"},
+        "neighbors_vrfs": {"type": "list", "elements": "str"},
+        "refresh": {"type": "dict", "options": refresh_spec},
+        "telemetry": {
+            "type": "dict",
+            "options": {
+                "state_file": {"type": "path", "required": True},
+                "max_age": {"default": 60, "type": "int"},
+            },
+        },
+        "routing_format": {"default": "list", "choices": ["list", "columnar"], "type": "str"},
+        "routing_delta": {
+            "type": "dict",
+            "options": {
+                "snapshot": {"type": "path", "required": True},
+                "resync": {"default": False, "type": "bool"},
+            },
+        },
+    }
     argument_spec.update(aristaeos_argument_spec)
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    largeFacts = module.params["large_facts"]
+    if largeFacts and largeFacts["mode"] == "file" and not largeFacts["path"]:
+        module.fail_json(msg="large_facts.path is required when large_facts.mode is file")
+    if largeFacts:
+        largeFacts["host"] = getFileHost(module, largeFacts["host"])
     gather_subset = module.params["gather_subset"]
     runable_subsets = set()
     exclude_subsets = set()
@@ -304,9 +813,15 @@ def main():
 
     facts = {"gather_subset": [runable_subsets]}
 
+    store = None
+    if module.params["refresh"]:
+        store = RefreshStore.load(module.params["refresh"]["store"], module.params["refresh"])
+
     instances = []
-    for key in runable_subsets:
+    # Default registers device interface names in key index used by other parsers
+    for key in sorted(runable_subsets, key=lambda name: (name != "default", name)):
         instances.append(FACT_SUBSETS[key](module))
+        instances[-1].store = store
 
     for inst in instances:
         if inst:
@@ -317,10 +832,21 @@ def main():
                 display.warning(traceback.format_exc())
                 raise Exception(traceback.format_exc()) from ex
 
+    if store:
+        store.save()
+        facts["refresh"] = store.report
+    facts["decode_stats"] = jsoncodec.getStats()
+    facts["collection_stats"] = collstats.getStats()
+    if module.params["stats_textfile"]:
+        collstats.writePrometheus(
+            module.params["stats_textfile"], facts["collection_stats"], module.params["stats_device"]
+        )
+
     ansible_facts = {}
     for key, value in iteritems(facts):
         key = f"ansible_net_{key}"
         ansible_facts[key] = value
+    ansible_facts = packFacts(ansible_facts, largeFacts)
 
     warnings = []
     check_args(module, warnings)
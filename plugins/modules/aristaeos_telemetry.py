@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""AristaEOS streaming telemetry collector (gNMI)
+Copyright: Contributors to the SENSE Project
+GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+Title                   : sdn-sense/sense-aristaeos-collection
+Author                  : Justas Balcas
+Email                   : juztas (at) gmail.com
+@Copyright              : General Public License v3.0+
+Date                    : 2024/09/30
+
+Subscribes to interface oper-status, counters and LLDP neighbors and keeps
+state_file up to date. aristaeos_facts serves these from state_file (option
+telemetry) instead of polling the device. Runs on the controller, usually as:
+  - sense.aristaeos.aristaeos_telemetry:
+      target: "{{ ansible_host }}:6030"
+      state_file: /var/lib/sense/telemetry/{{ inventory_hostname }}.json
+    delegate_to: localhost
+    async: 86400
+    poll: 0
+"""
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+from ansible_collections.sense.aristaeos.plugins.module_utils import telemetry
+from ansible_collections.sense.aristaeos.plugins.module_utils.runwrapper import functionwrapper
+
+
+@functionwrapper
+def getTarget(target):
+    """Split host:port target to tuple"""
+    host, _, port = target.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"target {target} is not in host:port format")
+    return (host.strip("[]"), int(port))
+
+
+@functionwrapper
+def main():
+    """main entry point for module execution
+    """
+    argument_spec = {
+        'target': {'required': True, 'type': 'str'},
+        'username': {'type': 'str'},
+        'password': {'type': 'str', 'no_log': True},
+        'insecure': {'default': False, 'type': 'bool'},
+        'skip_verify': {'default': False, 'type': 'bool'},
+        'path_cert': {'type': 'path'},
+        'state_file': {'required': True, 'type': 'path'},
+        'flush_interval': {'default': 5, 'type': 'float'},
+        'duration': {'type': 'float'},
+        'counters_interval': {'default': 10, 'type': 'float'}}
+
+    module = AnsibleModule(argument_spec=argument_spec,
+                           supports_check_mode=False)
+    clientFactory = telemetry.getGnmiClient()
+    if clientFactory is None:
+        module.fail_json(msg=missing_required_lib('pygnmi'))
+    try:
+        target = getTarget(module.params['target'])
+    except ValueError as ex:
+        module.fail_json(msg=str(ex))
+
+    paths = []
+    for path, mode, interval in telemetry.TELEMETRY_PATHS:
+        if mode == 'sample':
+            interval = module.params['counters_interval']
+        paths.append((path, mode, interval))
+    clientArgs = {'username': module.params['username'],
+                  'password': module.params['password'],
+                  'insecure': module.params['insecure'],
+                  'skip_verify': module.params['skip_verify']}
+    if module.params['path_cert']:
+        clientArgs['path_cert'] = module.params['path_cert']
+    collector = telemetry.GnmiCollector(target, module.params['state_file'], paths,
+                                        module.params['flush_interval'], clientFactory, **clientArgs)
+    try:
+        stats = collector.run(duration=module.params['duration'])
+    except Exception as ex:
+        module.fail_json(msg=f"Telemetry subscription to {module.params['target']} failed: {ex}",
+                         stats=collector.stats)
+    module.exit_json(changed=False, stats=stats, state_file=module.params['state_file'])
+
+
+if __name__ == '__main__':
+    main()
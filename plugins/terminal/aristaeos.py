@@ -20,6 +20,62 @@ from ansible.module_utils._text import to_bytes, to_text
 from ansible.plugins.terminal import TerminalBase
 
 
+# Combined equivalent of TerminalModule.terminal_stderr_re. Error line must not
+# contain any of the ignored phrases, checked once per line instead of per character.
+STDERR_RE = re.compile(
+    rb"% ?Error: (?![^\n]*\b(?:does not exist|already exists|Host not found|not active)\b)[^\n]*\n"
+    rb"|% ?Bad secret"
+    rb"|(?i:invalid input)"
+    rb"|(?i:(?:incomplete|ambiguous) command)"
+    rb"|(?i:connection timed out)"
+    rb"|'[^']' +returned error code: ?\d+"
+)
+
+# Prompt is always at the end of received output, it is enough to check this tail
+PROMPT_WINDOW = 512
+
+
+class TailMatcher:
+    """Precompiled matcher used by network_cli in place of a compiled regex (it calls
+    search() and reads pattern). Connection calls search() repeatedly with the whole
+    response buffer received so far; if buffer extends the previously scanned one, only
+    the new tail (plus last line, as match could start in it) is scanned.
+    With tail=True only the last `window` bytes (from line start) are scanned."""
+
+    def __init__(self, regex, tail=False, window=PROMPT_WINDOW):
+        self.regex = regex
+        self.pattern = regex.pattern
+        self.flags = regex.flags
+        self.tail = tail
+        self.window = window
+        self._lastBuf = b""
+        self._lastMatch = None
+
+    def _startPos(self, response):
+        if self.tail:
+            if len(response) <= self.window:
+                return 0
+            return max(response.rfind(b"\n", 0, len(response) - self.window), 0)
+        lastLen = len(self._lastBuf)
+        if lastLen and len(response) >= lastLen and response.startswith(self._lastBuf):
+            if self._lastMatch is not None:
+                # Already matched part is unchanged, same match as full scan would return
+                return self._lastMatch
+            # Rescan from start of the line before last scanned position
+            pos = response.rfind(b"\n", 0, max(response.rfind(b"\n", 0, lastLen), 0))
+            return max(pos, 0)
+        return 0
+
+    def search(self, response):
+        """Search response, starting at new data"""
+        pos = self._startPos(response)
+        match = self.regex.search(response, pos)
+        if not self.tail:
+            self._lastBuf = response
+            self._lastMatch = match.start() if match else None
+        return match
+
+
 class TerminalModule(TerminalBase):
 
     terminal_stdout_re = [
@@ -42,6 +98,12 @@ class TerminalModule(TerminalBase):
 
     terminal_initial_answer = b"y"
 
+    def __init__(self, *args, **kwargs):
+        super(TerminalModule, self).__init__(*args, **kwargs)
+        # Per connection matchers, they keep scan state of the current response
+        self.terminal_stdout_re = [TailMatcher(regex, tail=True) for regex in TerminalModule.terminal_stdout_re]
+        self.terminal_stderr_re = [TailMatcher(STDERR_RE)]
+
     def on_open_shell(self):
         try:
             self._exec_cli_command(b"terminal length 0")
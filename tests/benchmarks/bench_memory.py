@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of aristaeos_facts parser memory: peak RSS of interface and route
+parsing on synthetic device output. Each case runs in a new interpreter which
+reads generated output from file. Peak RSS is reported above the baseline
+taken after output is read; retained is the size of parsed facts (kept until
+module exit), each shared object counted once.
+legacy: dict per route and not interned values (previous parsers),
+interned: interned interface values, list: route records converted to dicts
+at output, columnar: route columns (routing_format columnar)
+
+Run: python tests/benchmarks/bench_memory.py [interfaces] [routes]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from ansible_collections.sense.aristaeos.plugins.modules import aristaeos_facts
+
+CASES = {"interfaces": ["legacy", "interned"], "routes": ["legacy", "list", "columnar"]}
+STATUSES = [("connected", "up"), ("notconnect", "down"), ("disabled", "down")]
+
+
+class Module:
+    """Minimal module with params used by parsers"""
+
+    def __init__(self, params):
+        self.params = params
+
+
+def getInterfaces(count):
+    """Get 'show interfaces status | json' output with count interfaces"""
+    out = {}
+    for idx in range(count):
+        link, proto = STATUSES[idx % len(STATUSES)]
+        out[f"Ethernet{idx // 64 + 1}/{idx % 64 + 1}"] = {
+            "description": f"to-host-{idx % 100}",
+            "lineProtocolStatus": proto,
+            "interfaceStatus": link,
+            "bandwidth": 100000000000,
+            "duplex": "duplexFull",
+        }
+    return json.dumps({"interfaceStatuses": out})
+
+
+def getRoutes(count):
+    """Get 'show ip route vrf all | json' output with count routes in 4 vrfs"""
+    vrfs = {}
+    for idx in range(count):
+        routes = vrfs.setdefault(f"vrf{idx % 4}", {"routes": {}})["routes"]
+        prefix = f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}/32"
+        routes[prefix] = {
+            "routeType": "eBGP",
+            "vias": [{"interface": f"Ethernet{idx % 32 + 1}/1", "nexthopAddr": f"172.16.0.{idx % 64 + 1}"}],
+        }
+    return json.dumps({"vrfs": vrfs})
+
+
+def legacyRoutes(data):
+    """Previous Routing.getRoutes: dict per route, values as decoded"""
+    out = []
+    for vrf, routes in data.get("vrfs", {}).items():
+        for rfrom, rdict in routes.get("routes", {}).items():
+            route = {"vrf": vrf, "from": rfrom}
+            if "vias" in rdict and len(rdict.get("vias", [])) > 0:
+                if "interface" in rdict["vias"][0]:
+                    route["intf"] = aristaeos_facts.KEY_INDEX.interface(rdict["vias"][0]["interface"])
+                if "nexthopAddr" in rdict["vias"][0]:
+                    route["to"] = rdict["vias"][0]["nexthopAddr"]
+            out.append(route)
+    return out
+
+
+def peakKb():
+    """Get peak RSS of this process in KB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def currentKb():
+    """Get current RSS of this process in KB"""
+    with open("/proc/self/statm", encoding="utf-8") as fd:
+        return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def factsKb(obj):
+    """Get size of facts in KB, shared (e.g. interned) objects are counted once"""
+    seen = set()
+    todo = [obj]
+    size = 0
+    while todo:
+        obj = todo.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            todo.extend(obj.keys())
+            todo.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            todo.extend(obj)
+    return size // 1024
+
+
+def child(kind, case, fname):
+    """Parse output from file and print peak RSS above baseline and facts size (KB)"""
+    with open(fname, "rb") as fd:
+        output = fd.read()
+    if kind == "interfaces":
+        responses = {"show interfaces status | json": output}
+        params = {"interface_fields": ["operstatus", "lineprotocol", "bandwidth", "duplex", "description"]}
+        inst = aristaeos_facts.Default(Module(params))
+    else:
+        responses = {"show ip route vrf all | json": output}
+        params = {"routing_format": case}
+        inst = aristaeos_facts.Routing(Module(params))
+    if case == "legacy":
+        aristaeos_facts.intern = lambda value: value
+        inst.getRoutes = legacyRoutes
+        inst.getOutput = lambda routes: routes
+    # Generated output is served instead of device responses
+    aristaeos_facts.run_commands = lambda module, commands, **kwargs: [responses.get(cmd, "{}") for cmd in commands]
+    base = currentKb()
+    inst.populate()
+    print(peakKb() - base, factsKb(inst.facts))
+
+
+def run(kind, case, fname):
+    """Run case in new interpreter and get peak RSS and facts size in MB"""
+    out = subprocess.run(
+        [sys.executable, __file__, "child", kind, case, fname], check=True, capture_output=True, text=True
+    )
+    return [int(val) / 1024 for val in out.stdout.strip().split("\n")[-1].split()]
+
+
+def main():
+    """Main benchmark"""
+    if len(sys.argv) > 1 and sys.argv[1] == "child":
+        child(sys.argv[2], sys.argv[3], sys.argv[4])
+        return
+    interfaces = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    routes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    print(f"{'parser':12} {'count':>9} {'case':>9} {'peak MB':>9} {'retained MB':>12}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for kind, count, generate in [("interfaces", interfaces, getInterfaces), ("routes", routes, getRoutes)]:
+            fname = os.path.join(tmpdir, f"{kind}.json")
+            with open(fname, "w", encoding="utf-8") as fd:
+                fd.write(generate(count))
+            for case in CASES[kind]:
+                peak, retained = run(kind, case, fname)
+                print(f"{kind:12} {count:9} {case:>9} {peak:9.1f} {retained:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
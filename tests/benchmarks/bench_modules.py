@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of module cold start: import time and AnsiballZ payload size.
+Payload is estimated the same way AnsiballZ recursive finder collects it:
+all ansible.module_utils and collection module_utils files reachable from
+module imports (including imports inside functions), zip compressed.
+
+Run: python tests/benchmarks/bench_modules.py [runs]
+"""
+import ast
+import importlib.util
+import io
+import statistics
+import subprocess
+import sys
+import time
+import zipfile
+
+MODULES = ["aristaeos_facts", "aristaeos_command", "aristaeos_config"]
+PREFIX = "ansible_collections.sense.aristaeos.plugins.modules."
+
+
+def isPayload(name):
+    """Check if module is shipped in AnsiballZ payload"""
+    return name.startswith("ansible.module_utils") or (
+        name.startswith("ansible_collections.") and ".plugins.module_utils" in name
+    )
+
+
+def findFile(name):
+    """Find source file of module (or package)"""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin
+
+
+def imports(fname, modname):
+    """Get all imported module names of source file"""
+    with open(fname, "rb") as fd:
+        tree = ast.parse(fd.read())
+    package = modname if fname.endswith("__init__.py") else modname.rpartition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                base = ".".join(package.split(".")[: len(package.split(".")) - node.level + 1] + [base]).strip(".")
+            yield base
+            for alias in node.names:
+                yield f"{base}.{alias.name}"
+
+
+def payload(module):
+    """Get list of payload files and zipped size"""
+    seen = {}
+    todo = [PREFIX + module]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        fname = findFile(name)
+        seen[name] = fname
+        if not fname:
+            continue
+        # Parent packages are shipped too
+        parts = name.split(".")
+        todo.extend(".".join(parts[:idx]) for idx in range(1, len(parts)))
+        todo.extend(dep for dep in imports(fname, name) if isPayload(dep))
+    files = sorted({fname for name, fname in seen.items() if fname and (isPayload(name) or name == PREFIX + module)})
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zfd:
+        for fname in files:
+            zfd.write(fname)
+    return files, len(buf.getvalue())
+
+
+def importTime(module, runs):
+    """Get median wall time of importing module in a new interpreter"""
+    cmd = [sys.executable, "-c", f"import {PREFIX}{module}"]
+    base = [sys.executable, "-c", "pass"]
+    out = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(base, check=True)
+        empty = time.perf_counter() - start
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True)
+        out.append(time.perf_counter() - start - empty)
+    return statistics.median(out)
+
+
+def main():
+    """Main benchmark"""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'module':20} {'import ms':>10} {'files':>6} {'payload KB':>11}")
+    for module in MODULES:
+        files, size = payload(module)
+        print(f"{module:20} {importTime(module, runs) * 1000:10.1f} {len(files):6} {size / 1024:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of resource index queries (free_vlans filter) on a synthetic
+fabric: index build time and average free_vlans query time over a path.
+Target is below 1ms per query on 10 devices with 1000 interfaces each.
+
+Run: python tests/benchmarks/bench_resindex.py [devices] [interfaces] [queries]
+"""
+import sys
+import time
+
+from ansible_collections.sense.aristaeos.plugins.filter.aristaeos import (
+    free_vlans, getIndex)
+
+
+def getDevices(count, interfaces):
+    """Get devices map with interfaces and vlan membership"""
+    devices = {}
+    for dev in range(count):
+        intfs = {
+            f"Ethernet{idx}/1": {"bandwidth": 100000, "vlans": f"{idx + 1}-{idx + 100}"}
+            for idx in range(interfaces)
+        }
+        devices[f"sw{dev}"] = {"ansible_net_interfaces": intfs}
+    return devices
+
+
+def main():
+    """Main benchmark"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    interfaces = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    devices = getDevices(count, interfaces)
+    path = [f"sw{dev}:Ethernet{(dev * 50) % interfaces}/1" for dev in range(count)]
+    start = time.perf_counter()
+    getIndex(devices)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(queries):
+        free_vlans(devices, path)
+    query = (time.perf_counter() - start) / queries
+    print(f"devices {count}, interfaces {interfaces}, path {len(path)} ports")
+    print(f"index build : {build * 1000:9.3f}ms")
+    print(f"query       : {query * 1000:9.3f}ms avg of {queries}")
+
+
+if __name__ == "__main__":
+    main()
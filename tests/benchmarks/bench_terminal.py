@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark of prompt and error matching in terminal plugin.
+Simulates network_cli libssh receive loop: for each received window the
+whole response received so far is checked for errors and prompt.
+
+Run: python tests/benchmarks/bench_terminal.py [size_mb] [window_kb]
+"""
+import sys
+import time
+
+from ansible_collections.sense.aristaeos.plugins.terminal.aristaeos import \
+    TerminalModule
+
+LINE = b"  10.1.2.0/24    via 10.0.0.1, Ethernet1/1, Error: none, static, 1d02h\r\n"
+
+
+def receive(stdoutRe, stderrRe, data, window):
+    """Run receive loop and return seconds spent in matching"""
+    resp = b""
+    spent = 0.0
+    for idx in range(0, len(data), window):
+        resp += data[idx : idx + window]
+        start = time.perf_counter()
+        for regex in stderrRe:
+            if regex.search(resp):
+                break
+        for regex in stdoutRe:
+            if regex.search(resp):
+                break
+        spent += time.perf_counter() - start
+    return spent
+
+
+def main():
+    """Main benchmark"""
+    sizeMb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    window = int(sys.argv[2]) * 1024 if len(sys.argv) > 2 else 64 * 1024
+    data = LINE * int(sizeMb * 1024 * 1024 / len(LINE)) + b"sdn-leaf-1#"
+    term = TerminalModule(None)
+    legacy = receive(TerminalModule.terminal_stdout_re, TerminalModule.terminal_stderr_re, data, window)
+    combined = receive(term.terminal_stdout_re, term.terminal_stderr_re, data, window)
+    mbytes = len(data) / 1024 / 1024
+    print(f"response {mbytes:.1f}MB, window {window // 1024}KB")
+    print(f"legacy   : {legacy:8.3f}s total, {legacy / mbytes * 1000:9.2f}ms/MB")
+    print(f"combined : {combined:8.3f}s total, {combined / mbytes * 1000:9.2f}ms/MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ansible.module_utils.connection import ConnectionError
+from ansible_collections.sense.aristaeos.plugins.cliconf.aristaeos import \
+    Cliconf
+from ansible_collections.sense.aristaeos.plugins.module_utils.configtree import \
+    ConfigTree
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import (
+    get_config, get_sublevel_config, load_config)
+from ansible_collections.sense.aristaeos.tests.unit.modules.aristaeos_module import \
+    load_fixture
+
+
+class FakeConnection:
+    """network_cli stand-in, records sent commands"""
+
+    def __init__(self):
+        self.sent = []
+        self.probe = "log 1"
+
+    def send(self, command, **kwargs):
+        command = command.decode()
+        self.sent.append(command)
+        if command == "show running-config":
+            return load_fixture("show_running-config_eos")
+        if command == "show logging":
+            return self.probe
+        return ""
+
+
+class TestAristaEOSCliconf(unittest.TestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+        self.cliconf = Cliconf(self.connection)
+        self.cliconf._options = {"config_cache_ttl": 60, "config_cache_probe": None, "config_commands": []}
+
+    def fetches(self):
+        return self.connection.sent.count("show running-config")
+
+    def test_config_cached(self):
+        text = self.cliconf.get_config()
+        self.assertIn("hostname sdn-leaf-1", text)
+        self.cliconf.get_config()
+        section = self.cliconf.get_config_section(["interface Port-Channel501"])
+        self.cliconf.get_config_section(["interface Ethernet1/1"])
+        self.assertEqual(1, self.fetches())
+        self.assertEqual(1, self.cliconf.get_config_cache_stats()["parses"])
+        self.assertTrue(section.startswith("interface Port-Channel501\n "))
+        self.assertIn(" switchport trunk allowed vlan 3600-3615,3620", section.split("\n"))
+
+    def test_invalidated_by_edit(self):
+        self.cliconf.get_config()
+        self.cliconf.edit_config(["interface Ethernet1/1", "description new"])
+        self.cliconf.get_config()
+        self.assertEqual(2, self.fetches())
+        self.assertEqual(["configure terminal", "interface Ethernet1/1", "description new", "end"],
+                         self.connection.sent[1:5])
+
+    def test_probe_and_ttl(self):
+        self.cliconf._options["config_cache_probe"] = "show logging"
+        self.cliconf.get_config()
+        self.cliconf.get_config()
+        self.assertEqual(1, self.fetches())
+        self.connection.probe = "log 2"
+        self.cliconf.get_config()
+        self.assertEqual(2, self.fetches())
+        self.cliconf._options["config_cache_ttl"] = 0
+        self.cliconf.get_config()
+        self.cliconf.get_config()
+        self.assertEqual(4, self.fetches())
+
+    def test_cache_off_by_default(self):
+        self.cliconf._options = {}
+        self.cliconf.get_config()
+        self.cliconf.get_config_section(["interface Ethernet1/1"])
+        self.assertEqual(2, self.fetches())
+        self.assertEqual(0, self.cliconf.get_config_cache_stats()["hits"])
+
+    def test_section_matches_netcommon(self):
+        tree = ConfigTree(load_fixture("show_running-config_eos"))
+        self.assertEqual("interface Ethernet9/1", tree.section(["interface Ethernet9/1"]))
+        self.assertIsNotNone(tree.getObject(["interface Ethernet1/1", "switchport mode trunk"]))
+
+
+class TestModuleUtilsConfig(unittest.TestCase):
+    MODPATH = "ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos"
+
+    def test_get_config_from_connection(self):
+        module = MagicMock(params={"parents": ["interface Ethernet1/1"]})
+        with patch(f"{self.MODPATH}.Connection") as conn:
+            conn.return_value.get_config.return_value = "hostname sw1\n"
+            conn.return_value.get_config_section.return_value = "interface Ethernet1/1"
+            self.assertEqual("hostname sw1", get_config(module))
+            self.assertEqual("interface Ethernet1/1", get_sublevel_config(None, module))
+
+    def test_get_config_fallback(self):
+        module = MagicMock(params={"parents": ["interface Ethernet1/1"]})
+        with patch(f"{self.MODPATH}.Connection") as conn, patch(f"{self.MODPATH}.exec_command") as execCmd:
+            conn.return_value.get_config.side_effect = ConnectionError("method not found")
+            conn.return_value.get_config_section.side_effect = ConnectionError("method not found")
+            execCmd.return_value = (0, load_fixture("show_running-config_eos"), "")
+            section = get_sublevel_config(None, module)
+        execCmd.assert_called_once_with(module, "show running-config")
+        self.assertIn(" switchport mode trunk", section.split("\n"))
+
+    def test_load_config_invalidates(self):
+        module = MagicMock(params={})
+        with patch(f"{self.MODPATH}.Connection") as conn, patch(f"{self.MODPATH}.exec_command") as execCmd:
+            execCmd.return_value = (0, "", "")
+            load_config(module, ["interface Ethernet1/1"])
+        conn.return_value.invalidate_config.assert_called_once_with()
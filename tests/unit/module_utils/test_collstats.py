@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import (
+    collstats, jsoncodec)
+from ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos import \
+    run_commands
+
+
+class TestCollectionStats(unittest.TestCase):
+    def setUp(self):
+        collstats.COLLECTION_STATS.clear()
+        jsoncodec.DECODE_STATS.clear()
+        self.addCleanup(collstats.COLLECTION_STATS.clear)
+        self.addCleanup(jsoncodec.DECODE_STATS.clear)
+
+    def test_run_commands_records(self):
+        module = MagicMock(params={}, jsonify=json.dumps)
+        with patch(
+            "ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos.exec_command",
+            return_value=(0, '{"version": "4.28.3M"}', ""),
+        ):
+            run_commands(module, ["show version | json"])
+            out = run_commands(module, ["show version | json"], raw=True)
+        jsoncodec.decode("show version | json", out[0])
+        stats = collstats.getStats()["show version | json"]
+        # Repeated call is not a retry
+        self.assertEqual(2, stats["calls"])
+        self.assertEqual(0, stats["retries"])
+        self.assertEqual(44, stats["bytes"])
+        with patch(
+            "ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos.exec_command",
+            return_value=(0, '{"version": "4.28.3M"}', ""),
+        ):
+            run_commands(module, ["show version | json"], retry=True)
+        stats = collstats.getStats()["show version | json"]
+        self.assertEqual(3, stats["calls"])
+        self.assertEqual(1, stats["retries"])
+        self.assertEqual(0, stats["errors"])
+        self.assertIn("parse_seconds", stats)
+
+    def test_encoded_size(self):
+        module = MagicMock(params={}, jsonify=json.dumps)
+        out = '{"description": "uplink \u2192 spine"}'
+        with patch(
+            "ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos.exec_command",
+            return_value=(0, out, ""),
+        ):
+            run_commands(module, ["show interfaces description | json"], raw=True)
+        jsoncodec.decode("show interfaces description | json", out)
+        size = len(out.encode("utf-8"))
+        self.assertEqual(size, collstats.getStats()["show interfaces description | json"]["bytes"])
+        self.assertEqual(size, jsoncodec.getStats()["show interfaces description | json"]["bytes"])
+
+    def test_prometheus_textfile(self):
+        collstats.record('show "x"', 0.5, 100)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "aristaeos.prom")
+            collstats.writePrometheus(fname, collstats.getStats(), "sdn-leaf-1")
+            with open(fname, encoding="utf-8") as fd:
+                data = fd.read()
+        self.assertIn("# TYPE aristaeos_command_latency_seconds gauge", data)
+        self.assertIn('aristaeos_command_latency_seconds{device="sdn-leaf-1",command="show \\"x\\""} 0.5', data)
+        self.assertIn('aristaeos_command_bytes{device="sdn-leaf-1",command="show \\"x\\""} 100', data)
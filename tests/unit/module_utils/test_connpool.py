@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.connpool import \
+    ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.pool = ConnectionPool(os.path.join(self.tmpdir.name, "pool.json"), maxPerHost=1, idleTimeout=30)
+
+    def socket(self, name):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8"):
+            pass
+        return path
+
+    def test_acquire_release(self):
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin"))
+        sock = self.socket("sw1")
+        self.assertEqual([], self.pool.release("sw1", 22, "admin", sock, True))
+        entry = self.pool.acquire("sw1", 22, "admin")
+        self.assertEqual(sock, entry["socket"])
+        self.assertTrue(entry["atExec"])
+        self.pool.release("sw1", 22, "admin", sock, False)
+        self.assertFalse(self.pool.acquire("sw1", 22, "admin")["atExec"])
+
+    def test_evict_dead_and_idle(self):
+        sock = self.socket("sw1")
+        self.pool.release("sw1", 22, "admin", sock, True)
+        os.unlink(sock)
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin"))
+        sock = self.socket("sw1")
+        self.pool.release("sw1", 22, "admin", sock, True)
+        with patch("time.time", return_value=time.time() + 31):
+            self.assertIsNone(self.pool.acquire("sw1", 22, "admin"))
+
+    def test_max_per_host(self):
+        self.pool.release("sw1", 22, "admin", self.socket("a"), True)
+        evicted = self.pool.release("sw1", 22, "operator", self.socket("b"), True)
+        self.assertEqual(["a"], [os.path.basename(entry["socket"]) for entry in evicted])
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin"))
+        self.assertIsNotNone(self.pool.acquire("sw1", 22, "operator"))
+
+    def test_credentials_in_key(self):
+        sock = self.socket("enabled")
+        self.pool.release("sw1", 22, "admin", sock, True, auth=["secret", True, "enable"])
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin"))
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin", auth=["secret", False, None]))
+        self.assertIsNone(self.pool.acquire("sw1", 22, "admin", auth=["other", True, "enable"]))
+        self.assertEqual(sock, self.pool.acquire("sw1", 22, "admin", auth=["secret", True, "enable"])["socket"])
+        with open(self.pool.registry, encoding="utf-8") as fd:
+            self.assertNotIn("secret", fd.read())
+
+    def test_replaced_socket_evicted(self):
+        self.pool.release("sw1", 22, "admin", self.socket("a"), True)
+        evicted = self.pool.release("sw1", 22, "admin", self.socket("b"), True)
+        self.assertEqual(["a"], [os.path.basename(entry["socket"]) for entry in evicted])
+
+    def test_busy_not_evicted(self):
+        sock = self.socket("a")
+        self.pool.release("sw1", 22, "admin", sock, True)
+        entry = self.pool.acquire("sw1", 22, "admin")
+        self.assertEqual(1, entry["busy"])
+        # Long running task: idle timeout passes and another key is released for same host
+        now = time.time()
+        with patch("time.time", return_value=now + 31):
+            self.assertIsNone(self.pool.acquire("sw1", 22, "operator"))
+            self.assertEqual([], self.pool.release("sw1", 22, "operator", self.socket("b"), True))
+        with patch("time.time", return_value=now + 32):
+            evicted = self.pool.release("sw1", 22, "admin", sock, True, held=entry["socket"])
+        self.assertEqual(["b"], [os.path.basename(entry["socket"]) for entry in evicted])
+        with patch("time.time", return_value=now + 33):
+            self.assertEqual(1, self.pool.acquire("sw1", 22, "admin")["busy"])
+
+    def test_max_per_host_counts_idle_sockets(self):
+        self.pool.release("sw1", 22, "admin", self.socket("a"), True)
+        held = self.pool.acquire("sw1", 22, "admin")["socket"]
+        # Busy socket is not counted, both sockets are kept while a is in use
+        self.assertEqual([], self.pool.release("sw1", 22, "operator", self.socket("b"), True))
+        evicted = self.pool.release("sw1", 22, "admin", held, True, held=held)
+        self.assertEqual(["b"], [os.path.basename(entry["socket"]) for entry in evicted])
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.keyindex import (
+    KeyIndex, canonicalInterface, canonicalMac)
+
+
+class TestKeyIndex(unittest.TestCase):
+    def test_canonical_interface(self):
+        self.assertEqual("Ethernet1/1", canonicalInterface("Et1/1"))
+        self.assertEqual("Ethernet1/1", canonicalInterface("eth 1/1"))
+        self.assertEqual("Port-Channel501", canonicalInterface("Po501"))
+        self.assertEqual("Vlan3610", canonicalInterface("vlan3610"))
+        self.assertEqual("Ethernet1/1.100", canonicalInterface("Et1/1.100"))
+        self.assertEqual("Cpu", canonicalInterface("Cpu"))
+        self.assertEqual("Foo1", canonicalInterface("Foo1"))
+
+    def test_canonical_mac(self):
+        self.assertEqual("b8:59:9f:ed:29:8e", canonicalMac("b859.9fed.298e"))
+        self.assertEqual("b8:59:9f:ed:29:8e", canonicalMac("B8-59-9F-ED-29-8E"))
+        self.assertEqual("sdn-spine-1", canonicalMac("sdn-spine-1"))
+        self.assertEqual("zzzz.zzzz.zzzz", canonicalMac("zzzz.zzzz.zzzz"))
+
+    def test_index(self):
+        index = KeyIndex()
+        index.register(["Ethernet1/1", "Ethernet2/1", "Ethernet2/2", "Port-Channel501", "Vlan10"])
+        self.assertEqual("Ethernet1/1", index.interface("Et1/1"))
+        self.assertEqual("Ethernet1/1", index.interface("Ethernet1"))
+        # Ethernet2 has several lanes, it is not resolved to one of them
+        self.assertEqual("Ethernet2", index.interface("Ethernet2"))
+        self.assertEqual("Port-Channel501", index.interface("po501"))
+        self.assertIs(index.mac("b859.9fed.298e"), index.mac("b859.9fed.298e"))
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.records import (
+    Route, intern, routesToColumns, routesToDicts)
+
+
+class TestRecords(unittest.TestCase):
+    def test_intern(self):
+        value = "".join(["connec", "ted"])
+        self.assertIs(intern("connected"), intern(value))
+        self.assertEqual(100, intern(100))
+
+    def test_routes(self):
+        routes = [Route("default", "10.0.0.0/24", "Vlan10", "10.0.0.1"), Route("mgmt", "0.0.0.0/0", None, None)]
+        columns = routesToColumns(routes)
+        self.assertEqual(["default", "mgmt"], columns["vrf"])
+        self.assertEqual(["10.0.0.0/24", "0.0.0.0/0"], columns["from"])
+        self.assertEqual(["Vlan10", None], columns["intf"])
+        self.assertEqual({"columns": ["vrf", "from", "intf", "to"], "vrf": [], "from": [], "intf": [], "to": []},
+                         routesToColumns([]))
+        self.assertEqual(
+            [{"vrf": "default", "from": "10.0.0.0/24", "intf": "Vlan10", "to": "10.0.0.1"},
+             {"vrf": "mgmt", "from": "0.0.0.0/0"}],
+            routesToDicts(routes),
+        )
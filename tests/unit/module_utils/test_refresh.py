@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import os
+import tempfile
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.refresh import \
+    RefreshStore
+
+
+class TestRefreshStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.fname = os.path.join(self.tmpdir.name, "sw1.json")
+
+    def test_stale(self):
+        store = RefreshStore.load(self.fname)
+        self.assertTrue(store.isStale("default", "show vlan | json", 60))
+        self.assertIsNone(store.getFragment("default", "show vlan | json"))
+        store.update("default", "show vlan | json", 60, {"3610": ["Ethernet1/1"]})
+        store.save()
+        store = RefreshStore.load(self.fname)
+        self.assertEqual({"3610": ["Ethernet1/1"]}, store.getFragment("default", "show vlan | json"))
+        self.assertFalse(store.isStale("default", "show vlan | json", 60))
+        self.assertTrue(store.isStale("default", "show vlan | json", 0))
+        # Entries are keyed by subset and command
+        self.assertTrue(store.isStale("lag", "show vlan | json", 60))
+        self.assertIsNone(store.getFragment("lag", "show vlan | json"))
+        store.now += 61
+        self.assertTrue(store.isStale("default", "show vlan | json", 60))
+        overrides = RefreshStore.load(self.fname, {"intervals": {"default": 0}})
+        self.assertTrue(overrides.isStale("default", "show vlan | json", 60))
+        forced = RefreshStore.load(self.fname, {"force": True})
+        self.assertTrue(forced.isStale("default", "show vlan | json", 60))
+
+    def test_adaptive(self):
+        store = RefreshStore(self.fname)
+        cmd = "show interfaces | json"
+        for _ in range(3):
+            store.update("default", cmd, 60, {"a": 1})
+        self.assertEqual(135, store.getEntry("default", cmd)["interval"])
+        # Other commands and other subsets adapt on their own fragments
+        store.update("default", "show version | json", 3600, {"macs": []})
+        store.update("lag", cmd, 60, {"a": 1})
+        self.assertEqual(3600, store.getEntry("default", "show version | json")["interval"])
+        self.assertEqual(60, store.getEntry("lag", cmd)["interval"])
+        for _ in range(10):
+            store.update("default", cmd, 60, {"a": 1})
+        self.assertEqual(240, store.getEntry("default", cmd)["interval"])
+        for idx in range(10):
+            store.update("default", cmd, 60, {"a": idx})
+        self.assertEqual(15, store.getEntry("default", cmd)["interval"])
+        store = RefreshStore(self.fname, {"adaptive": False})
+        store.update("default", cmd, 60, {"a": 1})
+        store.update("default", cmd, 60, {"a": 1})
+        self.assertEqual(60, store.getEntry("default", cmd)["interval"])
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.filter.aristaeos import (
+    free_vlans, getIndex, spare_bandwidth, vlan_ranges)
+
+DEVICES = {
+    "sw1": {
+        "ansible_facts": {
+            "ansible_net_interfaces": {
+                "Ethernet1/1": {"bandwidth": 100000, "operstatus": "connected", "vlans": "3610",
+                                "allowed_vlans": "3600-3620"},
+                "Ethernet4/1": {"bandwidth": 0, "operstatus": "notconnect"},
+                "Port-Channel501": {"bandwidth": 200000, "operstatus": "connected", "vlans": "3610-3611"},
+            }
+        }
+    },
+    # hostvars style, old facts with tagged lists only
+    "sw2": {
+        "ansible_net_interfaces": {
+            "Ethernet1": {"bandwidth": 100000, "operstatus": "connected"},
+            "Vlan3612": {"tagged": ["Ethernet1"]},
+        }
+    },
+}
+
+
+class TestResourceIndex(unittest.TestCase):
+    def test_free_vlans(self):
+        path = ["sw1:Ethernet1/1", {"device": "sw1", "port": "Port-Channel501"}, ["sw2", "Ethernet1"]]
+        self.assertEqual("3600-3609,3613-3625", free_vlans(DEVICES, path, "3600-3625"))
+        self.assertEqual("3600-3609,3613-3620", free_vlans(DEVICES, path, "3600-3625", within_allowed=True))
+        self.assertEqual([3600, 3601], free_vlans(DEVICES, path, "3600-3601", output="list"))
+
+    def test_spare_bandwidth(self):
+        out = spare_bandwidth(DEVICES, 100000, reserved={"sw1": {"Port-Channel501": 150000}})
+        self.assertEqual([("sw1", "Ethernet1/1"), ("sw2", "Ethernet1")], [(i["device"], i["port"]) for i in out])
+        self.assertEqual(3, len(spare_bandwidth(DEVICES, 0, up_only=False)))
+
+    def test_vlan_ranges(self):
+        self.assertEqual("1-3,5", vlan_ranges([3, 1, 2, 5]))
+
+    def test_large_index(self):
+        devices = {}
+        for dev in range(10):
+            interfaces = {f"Ethernet{idx}/1": {"bandwidth": 100000, "vlans": f"{idx + 1}-{idx + 100}"}
+                          for idx in range(1000)}
+            devices[f"sw{dev}"] = {"ansible_net_interfaces": interfaces}
+        path = [f"sw{dev}:Ethernet{dev * 50}/1" for dev in range(10)]
+        # Index is built once per devices map and reused by queries
+        index = getIndex(devices)
+        self.assertIs(index, getIndex(devices))
+        self.assertEqual("551-4094", free_vlans(devices, path))
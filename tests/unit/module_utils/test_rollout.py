@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import json
+import threading
+import unittest
+from unittest.mock import patch
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible_collections.sense.aristaeos.plugins.module_utils.rollout import (
+    Rollout, planWaves, rollout_spec)
+
+
+class FakeFleet:
+    """Devices keyed by socket path, config lines kept per device"""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.configs = {}
+        self.log = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def render(config):
+        """Running config with lines after interface line indented (as device shows it)"""
+        out = []
+        for line in config:
+            out.append(line if line.startswith(("hostname", "interface")) else f"   {line}")
+        return "\n".join(out)
+
+    def exec_command(self, module, command):
+        if command.startswith("{"):
+            command = json.loads(command)["command"]
+        host = module._socket_path
+        with self.lock:
+            self.log.append((host, command))
+            config = self.configs.setdefault(host, ["hostname " + host])
+            if command.startswith("configure checkpoint save "):
+                self.configs[host + ":" + command[26:]] = list(config)
+            elif command.startswith("configure replace checkpoint:"):
+                self.configs[host] = list(self.configs[host + ":" + command[29:]])
+            elif command == "dir checkpoint:":
+                names = [key.split(":", 1)[1] for key in self.configs if key.startswith(host + ":")]
+                return 0, "\n".join(f"-rw-  100  Oct 16 10:00  {name}" for name in names), ""
+            elif command.startswith("delete checkpoint:"):
+                del self.configs[host + ":" + command[18:]]
+            elif command.startswith("show running-config"):
+                return 0, self.render(config), ""
+            elif command in ["configure terminal", "end"]:
+                pass
+            elif host in self.broken and command.startswith("description"):
+                return 1, "", "% Invalid input"
+            else:
+                config.append(command)
+        return 0, "", ""
+
+
+def getParams(**kwargs):
+    params = {
+        "hosts": [f"sw{idx}" for idx in range(10)],
+        "lines": ["interface Ethernet1/1", "description sense"],
+        "host_lines": None,
+        "waves": [1, "50%", "100%"],
+        "concurrency": 4,
+        "verify": None,
+        "verify_lines": True,
+        "on_failure": "rollback",
+        "rollback_scope": "wave",
+        "max_failures": 0,
+        "backup_name": "rollout-test",
+        "backup_retention": 5,
+        "scheduler": None,
+    }
+    params.update(kwargs)
+    return params
+
+
+class TestRollout(unittest.TestCase):
+    def run_rollout(self, fleet, **kwargs):
+        with patch(
+            "ansible_collections.sense.aristaeos.plugins.module_utils.network.aristaeos.exec_command",
+            side_effect=fleet.exec_command,
+        ):
+            return Rollout(getParams(**kwargs), lambda host: host).run()
+
+    def test_plan_waves(self):
+        hosts = [f"sw{idx}" for idx in range(10)]
+        self.assertEqual([["sw0"], hosts[1:5], hosts[5:]], planWaves(hosts, [1, "50%", "100%"]))
+        self.assertEqual([hosts[:3], hosts[3:]], planWaves(hosts, [3]))
+        self.assertEqual([["sw0"]], planWaves(["sw0"], [1, "10%", "100%"]))
+
+    def test_rollout_spec_scheduler_defaults(self):
+        result = ArgumentSpecValidator(rollout_spec).validate(
+            {"hosts": ["sw0"], "lines": ["hostname sw0"], "scheduler": {"rate": 1}}
+        )
+        self.assertFalse(result.error_messages)
+        self.assertEqual(1.0, result.validated_parameters["scheduler"]["rate"])
+        self.assertEqual(2, result.validated_parameters["scheduler"]["max_concurrent"])
+        self.assertIsNone(result.validated_parameters["scheduler"]["lock_dir"])
+
+    def test_rollout_ok(self):
+        fleet = FakeFleet()
+        result = self.run_rollout(fleet)
+        self.assertFalse(result["failed"])
+        self.assertEqual([1, 4, 5], [len(wave["hosts"]) for wave in result["waves"]])
+        self.assertTrue(all(dev["status"] == "verified" for dev in result["devices"].values()))
+        self.assertIn("apply", result["devices"]["sw3"]["timing"])
+        self.assertIn("description sense", fleet.configs["sw9"])
+
+    def test_rollout_halt_and_rollback(self):
+        fleet = FakeFleet(broken=["sw2"])
+        result = self.run_rollout(fleet)
+        self.assertTrue(result["failed"])
+        self.assertTrue(result["halted"])
+        self.assertEqual(["sw2"], result["waves"][1]["failed"])
+        self.assertEqual(["sw1", "sw2", "sw3", "sw4"], result["rolled_back"])
+        self.assertEqual(["hostname sw1"], fleet.configs["sw1"])
+        # Canary wave stays applied, last wave is not touched
+        self.assertIn("description sense", fleet.configs["sw0"])
+        self.assertEqual("skipped", result["devices"]["sw7"]["status"])
+        self.assertNotIn("sw7", fleet.configs)
+
+    def test_rollout_verify_failure(self):
+        fleet = FakeFleet()
+        result = self.run_rollout(
+            fleet, verify=[{"command": "show running-config", "regexp": "^mtu 9214$"}], on_failure="halt"
+        )
+        self.assertTrue(result["halted"])
+        self.assertEqual(1, len(result["waves"]))
+        self.assertEqual("applied", result["devices"]["sw0"]["status"])
+        self.assertNotIn(("sw0", "configure checkpoint save rollout-test"), fleet.log)
+
+    def test_rollout_verify_normalized_lines(self):
+        fleet = FakeFleet()
+        for idx in range(10):
+            fleet.configs[f"sw{idx}"] = ["hostname sw", "interface Ethernet1/1", "switchport trunk allowed vlan 10-30"]
+        lines = ["interface Ethernet1/1", "switchport trunk allowed vlan add 20", "ip address 10.0.0.1 255.255.255.0"]
+        with patch.object(FakeFleet, "render", return_value="hostname sw\ninterface Ethernet1/1\n"
+                          "   switchport trunk allowed vlan 10-30\n   ip address 10.0.0.1/24"):
+            result = self.run_rollout(fleet, lines=lines)
+            self.assertFalse(result["failed"])
+            self.assertIn(("sw0", "show running-config interfaces Ethernet1/1"), fleet.log)
+            self.assertNotIn(("sw0", "show running-config"), fleet.log)
+            result = self.run_rollout(fleet, lines=["interface Et1/1", "switchport trunk allowed vlan add 40"])
+            self.assertTrue(result["failed"])
+            self.assertIn("switchport trunk allowed vlan add 40", result["devices"]["sw0"]["msg"])
+
+    def test_rollout_backup_retention(self):
+        fleet = FakeFleet()
+        for idx in range(6):
+            fleet.configs[f"sw0:rollout-2024101610000{idx}"] = []
+        fleet.configs["sw0:manual"] = []
+        result = self.run_rollout(fleet, hosts=["sw0"], backup_retention=3)
+        self.assertFalse(result["failed"])
+        self.assertEqual(4, len(result["devices"]["sw0"]["pruned"]))
+        self.assertEqual(
+            ["sw0:manual", "sw0:rollout-20241016100004", "sw0:rollout-20241016100005", "sw0:rollout-test"],
+            sorted(key for key in fleet.configs if key.startswith("sw0:")),
+        )
+
+    def test_rollout_continue(self):
+        fleet = FakeFleet(broken=["sw0"])
+        result = self.run_rollout(fleet, on_failure="continue", max_failures=1)
+        self.assertFalse(result["failed"])
+        self.assertEqual(3, len(result["waves"]))
+        self.assertEqual("failed", result["devices"]["sw0"]["status"])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from ansible_collections.sense.aristaeos.plugins.module_utils.scheduler import (
+    DeviceScheduler, classify, getDevice, getScheduler)
+
+
+class TestDeviceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.options = {
+            "max_concurrent": 2,
+            "heavy_concurrent": 1,
+            "rate": 0.0,
+            "burst": 10,
+            "timeout": 0.1,
+            "lock_dir": self.tmpdir.name,
+        }
+
+    def test_classify(self):
+        self.assertEqual("heavy", classify("show running-config"))
+        self.assertEqual("heavy", classify("show ip route vrf all | json"))
+        self.assertEqual("heavy", classify("show interfaces | json"))
+        self.assertEqual("light", classify("show interfaces status | json"))
+        self.assertEqual("light", classify("show version | json"))
+
+    def test_concurrency(self):
+        sched = DeviceScheduler("sw1", self.options)
+        heavy = sched.acquire("heavy")
+        # Only one heavy command at a time, light can still use the other slot
+        self.assertRaises(TimeoutError, sched.acquire, "heavy")
+        light = sched.acquire("light")
+        self.assertRaises(TimeoutError, sched.acquire, "light")
+        # Other device is not affected
+        other = DeviceScheduler("sw2", self.options).acquire("heavy")
+        for fd in [heavy, light, other]:
+            sched.release(fd)
+        sched.release(sched.acquire("heavy"))
+
+    def test_token_bucket(self):
+        self.options.update({"rate": 1.0, "burst": 8})
+        sched = DeviceScheduler("sw1", self.options)
+        self.assertEqual(0, sched._tryTokens("heavy"))
+        # 3 tokens left, heavy needs cost 5 plus reserve of 2 for light commands
+        self.assertGreater(sched._tryTokens("heavy"), 0)
+        self.assertEqual(0, sched._tryTokens("light"))
+        self.assertEqual(0, sched._tryTokens("config"))
+
+    def test_device_key(self):
+        module = MagicMock(params={"scheduler": dict(self.options)}, _socket_path="/tmp/pc/0a1b2c3d")
+        self.assertEqual("0a1b2c3d", getDevice(module))
+        module.params["provider"] = {"host": "10.0.0.1"}
+        self.assertEqual("10.0.0.1", getDevice(module))
+        module.params["scheduler"]["device"] = "sw1.example.net"
+        self.assertEqual("sw1.example.net", getDevice(module))
+        self.assertEqual("sw1.example.net", getScheduler(module).device)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import telemetry
+from ansible_collections.sense.aristaeos.plugins.module_utils.telemetry import (
+    GnmiCollector, TelemetryState, parsePath)
+
+
+class FakeGnmiClient:
+    """In-process fake of pygnmi gNMIclient (no gRPC transport), replays notifications
+    of subscribe2 and records the subscribe request"""
+
+    notifications = [
+        {"update": {"update": [
+            {"path": "interfaces/interface[name=Ethernet1/1]/state/oper-status", "val": "UP"},
+            {"path": "interfaces/interface[name=Ethernet2/1]/state/oper-status", "val": "DOWN"},
+            {"path": "interfaces/interface[name=Ethernet2/1]/state/admin-status", "val": "DOWN"},
+        ]}},
+        {"update": {"prefix": "lldp/interfaces/interface[name=Ethernet1/1]/neighbors/neighbor[id=1]", "update": [
+            {"path": "state", "val": {"openconfig-lldp:system-name": "sdn-spine-1",
+                                      "port-id": "Ethernet49/1", "chassis-id": "3c2c.3099.1a00"}},
+        ]}},
+        {"sync_response": True},
+        {"update": {"update": [
+            {"path": "interfaces/interface[name=Ethernet1/1]/state/counters/in-octets", "val": "1024"},
+        ]}},
+        {"update": {"delete": ["lldp/interfaces/interface[name=Ethernet1/1]/neighbors/neighbor[id=1]"]}},
+    ]
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+        self.kwargs = kwargs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def subscribe2(self, subscribe):
+        FakeGnmiClient.request = subscribe
+        yield from self.notifications
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.fname = os.path.join(self.tmpdir.name, "sw1.json")
+
+    def test_parse_path(self):
+        self.assertEqual(
+            [("interfaces", {}), ("interface", {"name": "Ethernet1/1"}), ("state", {})],
+            parsePath("/interfaces/interface[name=Ethernet1/1]/state"),
+        )
+
+    def test_collector_state(self):
+        collector = GnmiCollector(("sw1", 6030), self.fname, clientFactory=FakeGnmiClient)
+        stats = collector.run(maxNotifications=3)
+        self.assertTrue(stats["synced"])
+        self.assertEqual("stream", FakeGnmiClient.request["mode"])
+        state = TelemetryState.load(self.fname, maxAge=60)
+        self.assertEqual({"operstatus": "connected", "lineprotocol": "up"}, state.interfaces["Ethernet1/1"])
+        self.assertEqual("disabled", state.interfaces["Ethernet2/1"]["operstatus"])
+        self.assertEqual(
+            {"local_port_id": "Ethernet1/1", "remote_system_name": "sdn-spine-1",
+             "remote_port_id": "Ethernet49/1", "remote_chassis_id": "3c:2c:30:99:1a:00"},
+            state.lldp["Ethernet1/1"],
+        )
+
+    def test_collector_updates_after_sync(self):
+        collector = GnmiCollector(("sw1", 6030), self.fname, clientFactory=FakeGnmiClient)
+        collector.run()
+        state = TelemetryState.load(self.fname)
+        self.assertEqual({"in-octets": 1024}, state.interfaces["Ethernet1/1"]["counters"])
+        self.assertNotIn("Ethernet1/1", state.lldp)
+
+    def test_client_imported_on_run(self):
+        self.assertFalse(hasattr(telemetry, "gNMIclient"))
+        client = types.ModuleType("pygnmi.client")
+        client.gNMIclient = FakeGnmiClient
+        with patch.dict(sys.modules, {"pygnmi": types.ModuleType("pygnmi"), "pygnmi.client": client}):
+            collector = GnmiCollector(("sw1", 6030), self.fname)
+            self.assertIsNone(collector.clientFactory)
+            self.assertTrue(collector.run(maxNotifications=3)["synced"])
+
+    def test_delete(self):
+        state = TelemetryState()
+        prefix = "lldp/interfaces/interface[name=Ethernet1/1]/neighbors/neighbor"
+        state.apply(f"{prefix}[id=1]/state/system-name", "sdn-spine-1")
+        state.apply(f"{prefix}[id=2]/state/system-name", "sdn-spine-2")
+        state.apply("interfaces/interface[name=Ethernet1]/state/oper-status", "UP")
+        state.delete("lldp/interfaces/interface[name=Et1/1]/neighbors/neighbor[id=1]")
+        self.assertEqual("sdn-spine-2", state.lldp["Ethernet1/1"]["remote_system_name"])
+        state.save(self.fname)
+        state = TelemetryState.load(self.fname)
+        state.delete("interfaces/interface[name=Et1]")
+        state.delete("lldp/interfaces/interface[name=Ethernet1/1]/neighbors/neighbor[id=2]")
+        self.assertEqual({}, state.interfaces)
+        self.assertEqual({}, state.lldp)
+
+    def test_stale_state(self):
+        TelemetryState({"Ethernet1/1": {"operstatus": "connected"}}).save(self.fname)
+        self.assertIsNotNone(TelemetryState.load(self.fname, maxAge=60))
+        state = TelemetryState.load(self.fname, maxAge=-1)
+        self.assertIsNone(state)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.module_utils import \
+    vlanbitmap
+
+
+class TestVlanBitmap(unittest.TestCase):
+    def test_ranges(self):
+        bitmap = vlanbitmap.parseRanges("10-20,30, 4094")
+        self.assertEqual(13, vlanbitmap.count(bitmap))
+        self.assertEqual("10-20,30,4094", vlanbitmap.toRanges(bitmap))
+        self.assertEqual([1, 2, 3], vlanbitmap.toList(vlanbitmap.parseRanges("1-3")))
+        self.assertEqual("1-4094", vlanbitmap.toRanges(vlanbitmap.parseRanges("all")))
+        self.assertEqual("", vlanbitmap.toRanges(vlanbitmap.parseRanges("none")))
+        # Out of range values are clipped
+        self.assertEqual("4000-4094", vlanbitmap.toRanges(vlanbitmap.parseRanges("4000-4095,0")))
+
+    def test_allowed(self):
+        bitmap = vlanbitmap.applyAllowed(vlanbitmap.ALL_VLANS, "100-200")
+        bitmap = vlanbitmap.applyAllowed(bitmap, "add 300,301")
+        bitmap = vlanbitmap.applyAllowed(bitmap, "remove 150-200")
+        self.assertEqual("100-149,300-301", vlanbitmap.toRanges(bitmap))
+        self.assertEqual("1-9,4001-4094", vlanbitmap.toRanges(vlanbitmap.applyAllowed(0, "except 10-4000")))
+
+    def test_free(self):
+        ports = [vlanbitmap.parseRanges("3600-3610"), vlanbitmap.parseRanges("3605-3615,3620")]
+        pool = vlanbitmap.parseRanges("3600-3625")
+        self.assertEqual("3616-3619,3621-3625", vlanbitmap.toRanges(vlanbitmap.free(ports, pool)))
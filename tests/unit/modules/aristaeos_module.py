@@ -8,6 +8,10 @@ import unittest
 
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
+from ansible_collections.sense.aristaeos.plugins.module_utils import (
+    collstats, jsoncodec)
+from ansible_collections.sense.aristaeos.plugins.module_utils.keyindex import \
+    KEY_INDEX
 
 
 class AnsibleExitJson(Exception):
@@ -35,8 +39,17 @@ def fail_json(*args, **kwargs):
     raise AnsibleFailJson(kwargs)
 
 
+def reset_run_state():
+    """Clear per module run state (each module run is a new process on a real host)"""
+    jsoncodec.DECODE_STATS.clear()
+    collstats.COLLECTION_STATS.clear()
+    KEY_INDEX.clear()
+
+
 class ModuleTestCase(unittest.TestCase):
     def setUp(self):
+        reset_run_state()
+        self.addCleanup(reset_run_state)
         self.mock_module = unittest.mock.patch.multiple(
             basic.AnsibleModule,
             exit_json=exit_json,
@@ -88,6 +101,7 @@ class TestaristaEOSModule(ModuleTestCase):
     ):
 
         self.load_fixtures(commands)
+        reset_run_state()
 
         if failed:
             result = self.failed()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from unittest.mock import *
+
+from ansible_collections.sense.aristaeos.plugins.modules import aristaeos_command
+from ansible_collections.sense.aristaeos.tests.unit.modules.aristaeos_module import (
+    TestaristaEOSModule, set_module_args)
+
+
+class TestaristaEOSCommand(TestaristaEOSModule):
+
+    module = aristaeos_command
+
+    def setUp(self):
+        super(TestaristaEOSCommand, self).setUp()
+
+        self.mock_run_command = patch(
+            "ansible_collections.sense.aristaeos.plugins.modules.aristaeos_command.run_commands"
+        )
+        self.run_commands = self.mock_run_command.start()
+        self.bgpState = iter(["Connect", "Active", "Established"])
+
+    def tearDown(self):
+        super(TestaristaEOSCommand, self).tearDown()
+
+        self.mock_run_command.stop()
+
+    def load_fixtures(self, commands=None):
+        def load_from_file(*args, **kwargs):
+            _module, commands = args
+            output = []
+            for item in commands:
+                if item["command"] == "show version":
+                    output.append("Arista DCS-7280CR3-32P4-F")
+                elif item["command"] == "show ip bgp summary | json":
+                    state = next(self.bgpState)
+                    peers = {"10.0.0.1": {"peerState": state}}
+                    output.append(json.dumps({"vrfs": {"default": {"peers": peers}}}))
+            return output
+
+        self.run_commands.side_effect = load_from_file
+
+    def test_aristaeos_command_simple(self):
+        set_module_args({"commands": ["show version"]})
+        result = self.execute_module()
+        self.assertEqual(["Arista DCS-7280CR3-32P4-F"], result["stdout"])
+        self.assertEqual([["Arista DCS-7280CR3-32P4-F"]], result["stdout_lines"])
+
+    def test_aristaeos_command_wait_for_reruns_pending(self):
+        set_module_args(
+            {
+                "commands": ["show version", "show ip bgp summary | json"],
+                "wait_for": [
+                    "result[0] contains Arista",
+                    "result[1].vrfs.default.peers['10.0.0.1'].peerState == Established",
+                ],
+            }
+        )
+        result = self.execute_module()
+        self.assertIn("Established", result["stdout"][1])
+        calls = [[cmd["command"] for cmd in call[0][1]] for call in self.run_commands.call_args_list]
+        self.assertEqual(
+            [
+                ["show version", "show ip bgp summary | json"],
+                ["show ip bgp summary | json"],
+                ["show ip bgp summary | json"],
+            ],
+            calls,
+        )
+
+    def test_aristaeos_command_wait_for_backoff(self):
+        set_module_args(
+            {
+                "commands": ["show ip bgp summary | json"],
+                "wait_for": ["result[0].vrfs.default.peers['10.0.0.1'].peerState == Idle"],
+                "retries": 3,
+                "interval": 1,
+                "backoff": 2,
+                "max_interval": 1.5,
+            }
+        )
+        with patch("time.sleep") as sleep:
+            result = self.failed()
+            self.assertEqual([call(1.0), call(1.5)], sleep.call_args_list)
+        self.assertEqual(
+            ["result[0].vrfs.default.peers['10.0.0.1'].peerState == Idle"], result["failed_conditions"]
+        )
+
+    def test_aristaeos_command_wait_for_deadline(self):
+        set_module_args(
+            {
+                "commands": ["show ip bgp summary | json"],
+                "wait_for": ["result[0].vrfs.default.peers['10.0.0.1'].peerState == Idle"],
+                "interval": 5,
+                "deadline": 1,
+            }
+        )
+        self.execute_module(failed=True)
+        self.assertEqual(1, self.run_commands.call_count)
+
+    def test_aristaeos_command_dest(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            set_module_args(
+                {
+                    "commands": ["show version"],
+                    "dest": tmpdir,
+                    "dest_compress": True,
+                    "dest_max_size": 6,
+                    "dest_host": "sw1",
+                }
+            )
+            result = self.execute_module()
+            self.assertNotIn("stdout_lines", result)
+            stdout = result["stdout"][0]
+            # Hosts sharing dest do not overwrite each other files
+            self.assertEqual(os.path.join(tmpdir, "sw1_0_show_version.txt.gz"), stdout["path"])
+            self.assertEqual(6, stdout["size"])
+            self.assertTrue(stdout["truncated"])
+            with gzip.open(stdout["path"], "rb") as fd:
+                data = fd.read()
+            self.assertEqual(b"Arista", data)
+            self.assertEqual(hashlib.sha256(data).hexdigest(), stdout["sha256"])
+
+    def test_aristaeos_command_no_stdout_lines(self):
+        set_module_args({"commands": ["show version"], "stdout_lines": False})
+        result = self.execute_module()
+        self.assertNotIn("stdout_lines", result)
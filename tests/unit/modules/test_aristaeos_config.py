@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import os
+import tempfile
+from unittest.mock import *
+
+from ansible_collections.sense.aristaeos.plugins.modules import aristaeos_config
+from ansible_collections.sense.aristaeos.tests.unit.modules.aristaeos_module import (
+    TestaristaEOSModule, set_module_args)
+
+DIR_CHECKPOINT = """Directory of checkpoint:/
+
+       -rw-        4066           Oct 7 10:12  sense-20241007101200000
+       -rw-        4066           Oct 7 10:15  sense-20241007101500000
+       -rw-        4066           Oct 7 10:16  manual-1
+       -rw-        4066           Oct 7 10:18  sense-20241007101800000
+
+No space information available
+"""
+
+
+class TestaristaEOSConfig(TestaristaEOSModule):
+
+    module = aristaeos_config
+
+    def setUp(self):
+        super(TestaristaEOSConfig, self).setUp()
+        self.mock_run_commands = patch(
+            "ansible_collections.sense.aristaeos.plugins.module_utils.checkpoint.run_commands"
+        )
+        self.run_commands = self.mock_run_commands.start()
+        self.mock_load_config = patch(
+            "ansible_collections.sense.aristaeos.plugins.modules.aristaeos_config.load_config"
+        )
+        self.load_config = self.mock_load_config.start()
+        self.commands = []
+
+    def tearDown(self):
+        super(TestaristaEOSConfig, self).tearDown()
+        self.mock_run_commands.stop()
+        self.mock_load_config.stop()
+
+    def load_fixtures(self, commands=None):
+        def run(_module, commands):
+            self.commands.extend(commands)
+            return [DIR_CHECKPOINT if cmd == "dir checkpoint:" else "" for cmd in commands]
+
+        self.run_commands.side_effect = run
+
+    def getSrc(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".cfg", delete=False) as fd:
+            fd.write("interface Ethernet1/1\n   description sense\n")
+        self.addCleanup(os.unlink, fd.name)
+        return fd.name
+
+    def test_aristaeos_config_checkpoint(self):
+        set_module_args({"src": self.getSrc(), "checkpoint": {"name": "sense-20241007102000000", "retention": 2}})
+        result = self.execute_module(changed=True)
+        self.assertEqual("sense-20241007102000000", result["checkpoint"])
+        self.assertEqual(["sense-20241007101200000", "sense-20241007101500000"], result["deleted_checkpoints"])
+        self.assertEqual("configure checkpoint save sense-20241007102000000", self.commands[0])
+        self.assertIn("delete checkpoint:sense-20241007101500000", self.commands)
+        self.assertNotIn("delete checkpoint:manual-1", self.commands)
+        self.load_config.assert_called_once()
+
+    def test_aristaeos_config_rollback_last(self):
+        set_module_args({"rollback": "last"})
+        result = self.execute_module(changed=True)
+        self.assertEqual("sense-20241007101800000", result["rollback"])
+        self.assertEqual(["dir checkpoint:", "configure replace checkpoint:sense-20241007101800000"], self.commands)
+        self.load_config.assert_not_called()
+
+    def test_aristaeos_config_rollback_invalid_name(self):
+        set_module_args({"rollback": "x; reload"})
+        result = self.execute_module(failed=True)
+        self.assertIn("invalid checkpoint name", result["msg"])
+
+    def test_aristaeos_config_verify(self):
+        running = {
+            "show running-config interfaces Ethernet1/1": "interface Ethernet1/1\n   description sense\n   mtu 9214\n",
+            "show running-config interfaces Vlan10": "",
+        }
+        with patch("ansible_collections.sense.aristaeos.plugins.module_utils.verify.run_commands") as verifyRun:
+            verifyRun.side_effect = lambda _module, cmds, check_rc: [running[cmd] for cmd in cmds]
+            set_module_args({"lines": ["description sense", "no mtu", "no shutdown"], "parents": ["interface Ethernet1/1"],
+                             "verify": "report"})
+            result = self.execute_module(changed=True)
+            self.assertEqual(["show running-config interfaces Ethernet1/1"], result["verify"]["queries"])
+            self.assertEqual([["interface Ethernet1/1", "mtu"]], result["verify"]["unexpected"])
+            self.assertFalse(result["verify"]["passed"])
+            set_module_args({"lines": ["no interface Vlan10"], "verify": "fail"})
+            result = self.execute_module(changed=True)
+            self.assertTrue(result["verify"]["passed"])
+            set_module_args({"lines": ["mtu 1500"], "parents": ["interface Ethernet1/1"], "verify": "fail"})
+            result = self.execute_module(failed=True)
+            self.assertEqual([["interface Ethernet1/1", "mtu 1500"]], result["verify"]["missing"])
+            # Abbreviated interface name matches canonical name in running config
+            set_module_args({"lines": ["description  sense"], "parents": ["interface Et1/1"], "verify": "fail"})
+            result = self.execute_module(changed=True)
+            self.assertEqual(["show running-config interfaces Ethernet1/1"], result["verify"]["queries"])
+            self.assertTrue(result["verify"]["passed"])
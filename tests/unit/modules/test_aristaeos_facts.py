@@ -3,8 +3,12 @@
 __metaclass__ = type
 
 import json
+import os
+import tempfile
 from unittest.mock import *
 
+from ansible_collections.sense.aristaeos.plugins.module_utils import jsoncodec, payload
+from ansible_collections.sense.aristaeos.plugins.module_utils.telemetry import TelemetryState
 from ansible_collections.sense.aristaeos.plugins.modules import aristaeos_facts
 from ansible_collections.sense.aristaeos.tests.unit.modules.aristaeos_module import (
     TestaristaEOSModule, load_fixture, set_module_args)
@@ -22,10 +26,17 @@ class TestaristaEOSFacts(TestaristaEOSModule):
         )
         self.run_commands = self.mock_run_command.start()
 
+        self.mock_get_config = patch(
+            "ansible_collections.sense.aristaeos.plugins.modules.aristaeos_facts.get_config"
+        )
+        self.get_config = self.mock_get_config.start()
+        self.get_config.return_value = load_fixture("show_running-config_eos")
+
     def tearDown(self):
         super(TestaristaEOSFacts, self).tearDown()
 
         self.mock_run_command.stop()
+        self.mock_get_config.stop()
 
     def load_fixtures(self, commands=None):
         def load_from_file(*args, **kwargs):
@@ -42,7 +53,9 @@ class TestaristaEOSFacts(TestaristaEOSModule):
                     command = str(command).replace("|", "")
                 filename = str(command).replace(" ", "_")
                 filename = filename.replace("/", "7")
-                output.append(load_fixture(filename))
+                data = load_fixture(filename)
+                # Device returns json outputs as text
+                output.append(json.dumps(data) if isinstance(data, dict) else data)
             return output
 
         self.run_commands.side_effect = load_from_file
@@ -161,3 +174,254 @@ class TestaristaEOSFacts(TestaristaEOSModule):
         self.assertIn("ansible_net_routing", ansible_facts)
         self.assertIn("ipv4", ansible_facts["ansible_net_routing"])
         self.assertIn("ipv6", ansible_facts["ansible_net_routing"])
+
+    def test_aristaeos_facts_interface_planner(self):
+        self.assertEqual(
+            ["show interfaces description | json"],
+            aristaeos_facts.planInterfaceCommands(["description", "lineprotocol"]),
+        )
+        # status does not list Vlan interfaces, description is merged in
+        self.assertEqual(
+            ["show interfaces description | json", "show interfaces status | json"],
+            aristaeos_facts.planInterfaceCommands(["description", "operstatus", "bandwidth"]),
+        )
+        self.assertEqual(
+            ["show interfaces | json"],
+            aristaeos_facts.planInterfaceCommands(["description", "mtu"]),
+        )
+
+    def test_aristaeos_facts_interface_fields(self):
+        set_module_args({"gather_subset": ["default"], "interface_fields": ["description", "operstatus"]})
+        result = self.execute_module()
+        commands = self.run_commands.call_args_list[0][0][1]
+        self.assertIn("show interfaces status | json", commands)
+        self.assertNotIn("show interfaces | json", commands)
+        interfaces = result["ansible_facts"]["ansible_net_interfaces"]
+        self.assertEqual("sdn-dtn-1", interfaces["Ethernet1/1"]["description"])
+        self.assertEqual("connected", interfaces["Ethernet1/1"]["operstatus"])
+        self.assertNotIn("mtu", interfaces["Ethernet1/1"])
+        self.assertNotIn("lineprotocol", interfaces["Ethernet1/1"])
+        # Vlan interfaces are not listed by status, they come from description
+        self.assertIn("show interfaces description | json", commands)
+        self.assertEqual(["Ethernet1/1", "Port-Channel501"], interfaces["Vlan3610"]["tagged"])
+
+    def test_aristaeos_facts_config_summary(self):
+        set_module_args({"gather_subset": ["config"]})
+        result = self.execute_module()
+        config = result["ansible_facts"]["ansible_net_config"]
+        self.assertEqual("sdn-leaf-1", config["hostname"])
+        self.assertEqual(7, config["interfaces"])
+        self.assertEqual(64, len(config["sha256"]))
+        self.assertNotIn("text", config)
+
+    def test_aristaeos_facts_config_not_fetched(self):
+        set_module_args({"interface_fields": ["description"]})
+        result = self.execute_module()
+        self.assertFalse(self.get_config.called)
+        self.assertNotIn("ansible_net_config", result["ansible_facts"])
+        self.assertIn("ansible_net_ipv4", result["ansible_facts"])
+
+    def test_aristaeos_facts_large_facts_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            set_module_args(
+                {
+                    "gather_subset": ["config"],
+                    "config_text": True,
+                    "large_facts": {"mode": "file", "threshold": 1024, "path": tmpdir, "host": "sw1/a"},
+                }
+            )
+            result = self.execute_module()
+            packed = result["ansible_facts"]["ansible_net_config"]
+            self.assertEqual("gzip", packed["encoding"])
+            # Hosts sharing the path do not overwrite each other files
+            self.assertEqual(os.path.join(tmpdir, "sw1_a_ansible_net_config.json.gz"), packed["path"])
+            config = payload.unpackValue(packed)
+            self.assertEqual(load_fixture("show_running-config_eos"), config["text"])
+            # Small facts stay inline
+            self.assertIn("macs", result["ansible_facts"]["ansible_net_info"])
+
+    def test_aristaeos_facts_large_facts_compress(self):
+        set_module_args(
+            {"gather_subset": ["config"], "config_text": True, "large_facts": {"mode": "compress", "threshold": 1024}}
+        )
+        result = self.execute_module()
+        packed = result["ansible_facts"]["ansible_net_config"]
+        self.assertEqual("zlib+base64", packed["encoding"])
+        self.assertEqual("sdn-leaf-1", payload.unpackValue(packed)["hostname"])
+
+    def test_aristaeos_facts_decode_stats(self):
+        set_module_args({"gather_subset": ["default"]})
+        result = self.execute_module()
+        stats = result["ansible_facts"]["ansible_net_decode_stats"]
+        self.assertIn("show interfaces | json", stats)
+        self.assertEqual(jsoncodec.CODEC, stats["show interfaces | json"]["codec"])
+        self.assertGreater(stats["show interfaces | json"]["bytes"], 0)
+        # Stats cover this module run only
+        self.assertEqual(1, stats["show version | json"]["count"])
+        result = self.execute_module()
+        self.assertEqual(1, result["ansible_facts"]["ansible_net_decode_stats"]["show version | json"]["count"])
+
+    def test_aristaeos_facts_decode_bytes(self):
+        self.assertEqual({"a": 1}, aristaeos_facts.loadJson(b'{"a": 1}', name="bytes"))
+        self.assertEqual({}, aristaeos_facts.loadJson("% Invalid input", name="invalid"))
+        self.assertEqual(1, jsoncodec.DECODE_STATS["invalid"]["errors"])
+
+    def test_aristaeos_facts_routing_delta(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = {"gather_subset": ["routing"], "routing_delta": {"snapshot": f"{tmpdir}/sdn-leaf-1.json"}}
+            set_module_args(dict(args))
+            result = self.execute_module()
+            self.assertTrue(result["ansible_facts"]["ansible_net_routing_delta"]["resync"])
+            self.assertEqual(3, len(result["ansible_facts"]["ansible_net_ipv4"]))
+
+            # Modify snapshot: one route removed, one changed
+            with open(f"{tmpdir}/sdn-leaf-1.json", encoding="utf-8") as fd:
+                snapshot = json.load(fd)
+            del snapshot["routes"]["ipv4"]["default"]["10.10.10.0/24"]
+            snapshot["routes"]["ipv4"]["mgmt"]["0.0.0.0/0"][1] = "10.0.0.2"
+            snapshot["routes"]["ipv6"]["default"]["2001:db8:1::/64"] = ["Vlan3610", None]
+            with open(f"{tmpdir}/sdn-leaf-1.json", "w", encoding="utf-8") as fd:
+                json.dump(snapshot, fd)
+
+            set_module_args(dict(args))
+            result = self.execute_module()
+            delta = result["ansible_facts"]["ansible_net_routing_delta"]
+            self.assertNotIn("ansible_net_ipv4", result["ansible_facts"])
+            self.assertFalse(delta["resync"])
+            self.assertEqual([{"vrf": "default", "from": "10.10.10.0/24", "intf": "Vlan3610"}], delta["ipv4"]["added"])
+            self.assertEqual("10.0.0.1", delta["ipv4"]["changed"][0]["to"])
+            self.assertEqual([{"vrf": "default", "from": "2001:db8:1::/64", "intf": "Vlan3610"}], delta["ipv6"]["removed"])
+
+            args["routing_delta"]["resync"] = True
+            set_module_args(dict(args))
+            result = self.execute_module()
+            self.assertTrue(result["ansible_facts"]["ansible_net_routing_delta"]["resync"])
+            self.assertIn("ansible_net_ipv6", result["ansible_facts"])
+
+    def test_aristaeos_facts_routing_columnar(self):
+        set_module_args({"gather_subset": ["routing"]})
+        routes = self.execute_module()["ansible_facts"]["ansible_net_ipv4"]
+        set_module_args({"gather_subset": ["routing"], "routing_format": "columnar"})
+        columns = self.execute_module()["ansible_facts"]["ansible_net_ipv4"]
+        self.assertEqual(["vrf", "from", "intf", "to"], columns["columns"])
+        self.assertEqual([route["from"] for route in routes], columns["from"])
+        self.assertEqual([route.get("to") for route in routes], columns["to"])
+
+    def test_aristaeos_facts_vlans(self):
+        set_module_args({"gather_subset": ["default"]})
+        result = self.execute_module()
+        interfaces = result["ansible_facts"]["ansible_net_interfaces"]
+        self.assertEqual("3610-3611", interfaces["Port-Channel501"]["vlans"])
+        self.assertEqual("3610", interfaces["Ethernet1/1"]["vlans"])
+        self.assertEqual(["Ethernet1/1", "Port-Channel501"], interfaces["Vlan3610"]["tagged"])
+        self.assertEqual("3600-3615,3620", interfaces["Port-Channel501"]["allowed_vlans"])
+        self.assertEqual("3610", interfaces["Ethernet1/1"]["allowed_vlans"])
+        self.assertEqual("100", interfaces["Ethernet4/1"]["allowed_vlans"])
+        # Switchport facts come from switchport command, running config is not fetched
+        self.assertEqual("yes", interfaces["Port-Channel501"]["switchport"])
+        self.assertFalse(self.get_config.called)
+
+    def test_aristaeos_facts_telemetry(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        fname = f"{tmpdir.name}/sw1.json"
+        TelemetryState(
+            {"Ethernet1/1": {"operstatus": "notconnect", "lineprotocol": "down", "counters": {"in-octets": 1}}},
+            {"Ethernet2/1": {"local_port_id": "Ethernet2/1", "remote_system_name": "sdn-spine-2"}},
+        ).save(fname)
+        set_module_args({"gather_subset": ["default"], "telemetry": {"state_file": fname}})
+        result = self.execute_module()
+        commands = self.run_commands.call_args[0][1]
+        self.assertNotIn("show lldp neighbors detail | json", commands)
+        self.assertNotIn("show interfaces status | json", commands)
+        facts = result["ansible_facts"]
+        self.assertEqual("notconnect", facts["ansible_net_interfaces"]["Ethernet1/1"]["operstatus"])
+        self.assertEqual({"in-octets": 1}, facts["ansible_net_interfaces"]["Ethernet1/1"]["counters"])
+        self.assertEqual(["Ethernet2/1"], list(facts["ansible_net_lldp"]))
+        # Stale state is ignored and device is polled
+        set_module_args({"gather_subset": ["default"], "telemetry": {"state_file": fname, "max_age": -1}})
+        result = self.execute_module()
+        self.assertIn("show lldp neighbors detail | json", self.run_commands.call_args[0][1])
+        self.assertEqual("sdn-spine-1", result["ansible_facts"]["ansible_net_lldp"]["Ethernet2/1"]["remote_system_name"])
+
+    def test_aristaeos_facts_neighbors(self):
+        set_module_args({"gather_subset": ["neighbors"]})
+        result = self.execute_module()
+        neighbors = result["ansible_facts"]["ansible_net_neighbors"]
+        entries = neighbors["entries"]
+        self.assertEqual(6, len(entries))
+        idx = neighbors["by_ip"]["10.10.10.2"][0]
+        self.assertEqual(["default", "10.10.10.2", "b8:59:9f:ed:29:8f", "Vlan3610", "Port-Channel501"], entries[idx])
+        self.assertEqual(3, len(neighbors["by_mac"]["b8:59:9f:ed:29:8e"]))
+        self.assertEqual(3, len(neighbors["by_interface"]["Ethernet1/1"]))
+        self.assertEqual(4, len(neighbors["by_interface"]["Vlan3610"]))
+        self.assertEqual("mgmt", entries[neighbors["by_ip"]["10.0.0.1"][0]][0])
+
+    def test_aristaeos_facts_neighbors_vrf(self):
+        set_module_args({"gather_subset": ["neighbors"], "neighbors_vrfs": ["mgmt"]})
+        result = self.execute_module()
+        commands = [cmd for call in self.run_commands.call_args_list for cmd in call[0][1]]
+        self.assertIn("show ip arp vrf mgmt | json", commands)
+        self.assertNotIn("show ip arp vrf all | json", commands)
+        entries = result["ansible_facts"]["ansible_net_neighbors"]["entries"]
+        self.assertEqual([["mgmt", "10.0.0.1", "00:50:56:00:00:01", "Management1", "Management1"]], entries)
+
+    def test_aristaeos_facts_lag(self):
+        set_module_args({"gather_subset": ["lag"]})
+        result = self.execute_module()
+        facts = result["ansible_facts"]
+        lag = facts["ansible_net_lags"]["Port-Channel501"]
+        self.assertEqual(["Ethernet2/1", "Ethernet3/1"], lag["members"])
+        self.assertEqual(200000, lag["active_bandwidth"])
+        self.assertEqual("connected", lag["status"])
+        self.assertEqual("active-full", lag["mlag_status"])
+        self.assertEqual(501, lag["mlag_id"])
+        self.assertEqual([], facts["ansible_net_lags"]["Port-Channel1000"]["active"])
+        self.assertEqual("Port-Channel1000", facts["ansible_net_lag_members"]["Ethernet4/1"])
+        self.assertEqual("Port-Channel501", facts["ansible_net_lag_members"]["Ethernet2/1"])
+        self.assertEqual("Port-Channel1000", facts["ansible_net_mlag"]["peer_link"])
+        self.assertEqual(["Ethernet2/1", "Ethernet3/1"], facts["ansible_net_interfaces"]["Port-Channel501"]["channel-member"])
+
+    def test_aristaeos_facts_refresh_subsets(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            args = {"gather_subset": ["routing", "lag"], "refresh": {"store": f"{tmpdir}/sw1.json"}}
+            set_module_args(args)
+            first = self.execute_module()["ansible_facts"]
+            calls = self.run_commands.call_count
+            second = self.execute_module()["ansible_facts"]
+            self.assertEqual(calls, self.run_commands.call_count)
+            for key in ["ansible_net_ipv4", "ansible_net_ipv6", "ansible_net_lags", "ansible_net_mlag"]:
+                self.assertEqual(first[key], second[key])
+            # Same command of two subsets has own entry in each subset
+            report = second["ansible_net_refresh"]
+            self.assertIn("show interfaces status | json", report["lag"])
+            self.assertNotIn("show interfaces status | json", report["default"])
+
+    def test_aristaeos_facts_refresh(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            refresh = {"store": f"{tmpdir}/sw1.json"}
+            set_module_args({"gather_subset": ["default"], "interface_fields": ["mtu"], "refresh": refresh})
+            first = self.execute_module()
+            self.assertEqual(1, self.run_commands.call_count)
+            # All commands fresh - facts are built from stored fragments, device is not queried
+            second = self.execute_module()
+            self.assertEqual(1, self.run_commands.call_count)
+            self.assertEqual(first["ansible_facts"]["ansible_net_lldp"], second["ansible_facts"]["ansible_net_lldp"])
+            self.assertEqual(
+                first["ansible_facts"]["ansible_net_interfaces"], second["ansible_facts"]["ansible_net_interfaces"]
+            )
+            self.assertEqual(first["ansible_facts"]["ansible_net_info"], second["ansible_facts"]["ansible_net_info"])
+            report = second["ansible_facts"]["ansible_net_refresh"]["default"]
+            self.assertFalse(report["show vlan | json"]["fetched"])
+            # Only the stale command is fetched, others are served from store
+            refresh["intervals"] = {"show interfaces | json": 0}
+            set_module_args({"gather_subset": ["default"], "interface_fields": ["mtu"], "refresh": refresh})
+            third = self.execute_module()
+            self.assertEqual(["show interfaces | json"], self.run_commands.call_args[0][1])
+            report = third["ansible_facts"]["ansible_net_refresh"]["default"]
+            self.assertTrue(report["show interfaces | json"]["fetched"])
+            self.assertFalse(report["show version | json"]["fetched"])
+            self.assertEqual(3600, report["show version | json"]["interval"])
+            self.assertEqual(
+                first["ansible_facts"]["ansible_net_interfaces"], third["ansible_facts"]["ansible_net_interfaces"]
+            )
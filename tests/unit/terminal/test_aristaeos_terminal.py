@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__metaclass__ = type
+
+import unittest
+
+from ansible_collections.sense.aristaeos.plugins.terminal.aristaeos import \
+    TerminalModule
+
+RESPONSES = [
+    b"show vlan\r\nVLAN  Name\r\n1     default\r\nsdn-leaf-1#",
+    b"% Error: vlan 5000 does not exist\nsdn-leaf-1(config)#",
+    b"% Error: interface Ethernet9/1 is not valid\nsdn-leaf-1(config)#",
+    b"% Invalid input (at token 1: 'foo')\nsdn-leaf-1>",
+    b"% Incomplete command\n[admin@sdn-leaf-1 ]$",
+    b"% Bad secret\r\n",
+    b"'show x' returned error code: 3\r\n",
+    b"% Error: already exists in vrf\n",
+]
+
+
+class TestTerminalMatchers(unittest.TestCase):
+    def setUp(self):
+        self.term = TerminalModule(None)
+
+    @staticmethod
+    def legacy(regexes, response):
+        return any(regex.search(response) for regex in regexes)
+
+    def test_same_result_as_legacy(self):
+        for response in RESPONSES:
+            for legacyRe, newRe in [
+                (TerminalModule.terminal_stderr_re, self.term.terminal_stderr_re),
+                (TerminalModule.terminal_stdout_re, self.term.terminal_stdout_re),
+            ]:
+                self.assertEqual(self.legacy(legacyRe, response), self.legacy(newRe, response), response)
+
+    def test_incremental_buffer(self):
+        matcher = self.term.terminal_stderr_re[0]
+        resp = b"line\n" * 1000 + b"% Err"
+        self.assertIsNone(matcher.search(resp))
+        resp += b"or: bad vlan\n"
+        self.assertIsNotNone(matcher.search(resp))
+        # Same error is reported while buffer grows
+        resp += b"more output\n"
+        self.assertIsNotNone(matcher.search(resp))
+        # New buffer is scanned from start
+        self.assertIsNone(matcher.search(b"line\n" * 1000))
+
+    def test_prompt_tail(self):
+        matcher = self.term.terminal_stdout_re[0]
+        match = matcher.search(b"x" * 5000 + b"\r\nsdn-leaf-1(config-if-Et1/1)#")
+        self.assertEqual(b"\nsdn-leaf-1(config-if-Et1/1)#", match.group())
+        self.assertIsNone(matcher.search(b"sdn-leaf-1#\r\n" + b"x" * 5000))